@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blood_donation.settings')
+# Read by settings: persistent connections are WSGI-only
+os.environ['DJANGO_ASGI'] = '1'
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    from core.templating import warm_template_cache
+
+    warm_template_cache()
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,23 +44,90 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.SessionIdentityMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
+# Per-view SQL query counts/timings (response headers + /internal/query-metrics/).
+# Off by default; set QUERY_INSTRUMENTATION=1 to turn it on.
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION') == '1'
+
+# Per-request cProfile captures (summarize with `manage.py profile_report`).
+# With PROFILING=1, staff can profile a request by sending "X-Profile: 1";
+# PROFILING_SAMPLE_RATE (0-1) also profiles that share of all requests.
+PROFILING = os.environ.get('PROFILING') == '1'
+PROFILING_HEADER = 'X-Profile'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', BASE_DIR / 'profiles')
+
+# Prometheus metrics at /metrics (off by default; METRICS=1 to turn on). Each
+# worker process writes to its own file in METRICS_DIR and /metrics sums them,
+# dropping files of exited workers, so all workers must share the directory.
+# Set METRICS_DIR='' for single-process, in-memory only. /metrics is for staff,
+# or for scrapers sending "Authorization: Bearer <METRICS_TOKEN>".
+METRICS = os.environ.get('METRICS') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'blood-donation-metrics'))
+
+# Token-bucket limits on anonymous POSTs, by URL name: (scope, burst, seconds)
+# rules, where scope 'ip' is per client address and 'all' is endpoint-wide.
+# A bucket holds `burst` requests and refills over `seconds`. Each urgent
+# blood request emails every matching donor, so request_blood is the tightest.
+# It has no endpoint-wide bucket on purpose: a handful of addresses could
+# empty one and lock out every genuine request for blood.
+# RATE_LIMIT_STORE 'cache' counts per process (the 'ratelimit' cache below);
+# 'sqlite' shares the buckets between all workers through RATE_LIMIT_DB.
+RATE_LIMIT = os.environ.get('RATE_LIMIT', '1') == '1'
+RATE_LIMITS = {
+    'request_blood': [('ip', 3, 600)],
+    'feedback': [('ip', 5, 600)],
+    'home': [('ip', 5, 600)],  # the feedback form on the home page
+    'donor_register': [('ip', 5, 3600)],
+    'donor_request': [('ip', 5, 600)],
+}
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'cache')
+RATE_LIMIT_DB = os.environ.get('RATE_LIMIT_DB', BASE_DIR / 'ratelimit.sqlite3')
+# Set to e.g. HTTP_X_FORWARDED_FOR when behind a reverse proxy
+RATE_LIMIT_IP_HEADER = os.environ.get('RATE_LIMIT_IP_HEADER', '')
+
+# Feedback is inserted in the background, in batches, instead of on the request
+# (see core/writebehind.py): after WRITE_BEHIND_MAX_ROWS rows or
+# WRITE_BEHIND_MAX_DELAY seconds. Rows wait in spool files in WRITE_BEHIND_DIR,
+# which must survive restarts. WRITE_BEHIND=0 saves each row right away.
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', '1') == '1'
+WRITE_BEHIND_DIR = os.environ.get('WRITE_BEHIND_DIR', BASE_DIR / 'spool')
+WRITE_BEHIND_MAX_ROWS = int(os.environ.get('WRITE_BEHIND_MAX_ROWS', '100'))
+WRITE_BEHIND_MAX_DELAY = float(os.environ.get('WRITE_BEHIND_MAX_DELAY', '5'))
+
 ROOT_URLCONF = 'blood_donation.urls'
 
+# Compiled templates are cached per process (the cached loader is Django's
+# default too, but listing it lets bench_templates compare against parsing).
+# TEMPLATE_WARMUP compiles every template when wsgi.py/asgi.py start, instead
+# of on each page's first request; off by default in DEBUG.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', '0' if DEBUG else '1') == '1'
+
 TEMPLATES = [
      {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],  # <-- make sure this is here
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -75,13 +144,63 @@ WSGI_APPLICATION = 'blood_donation.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLite tuning profile, applied to every new connection through init_command.
+# WAL lets readers carry on while one writer commits, synchronous=NORMAL is
+# crash-safe under WAL with far fewer fsyncs, and the busy timeout makes
+# writers queue instead of failing with "database is locked". IMMEDIATE
+# transactions take the write lock up front, so the timeout also covers them;
+# that goes for every atomic() block, read-only ones included, so keep reads
+# (exports, dashboards) outside atomic().
+# Set SQLITE_TUNING=0 to get the stock behaviour back
+# (`manage.py bench_sqlite` compares the two).
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') == '1'
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,        # ms
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,         # negative = KiB, so ~20 MB
+    'temp_store': 'MEMORY',
+}
+
+# Set by blood_donation/asgi.py
+SERVING_ASGI = os.environ.get('DJANGO_ASGI') == '1'
+
+SQLITE_TUNED_OPTIONS = {
+    'timeout': 20,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Persistent connections skip reconnecting and re-running the pragmas.
+        # WSGI only: under ASGI each request runs its queries on a new thread,
+        # and so a new connection, which would then be left open
+        'CONN_MAX_AGE': 600 if SQLITE_TUNING and not SERVING_ASGI else 0,
+        'CONN_HEALTH_CHECKS': SQLITE_TUNING,
+        'OPTIONS': SQLITE_TUNED_OPTIONS if SQLITE_TUNING else {},
     }
 }
 
+# Optional read replica. Point DATABASE_REPLICA at a second SQLite file and
+# keep it in sync with `manage.py sync_replica` (e.g. every minute from cron);
+# views marked @replica_reads then read from it. Writes always go to default,
+# and a browser that just POSTed reads from default for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICA = os.environ.get('DATABASE_REPLICA')
+if DATABASE_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DATABASE_REPLICA,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -100,9 +219,61 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+#
+# PBKDF2 work factor for donor and hospital passwords. Unset means Django's
+# own default (1,000,000 in 5.2), which goes up with Django upgrades. Each
+# login costs roughly this many SHA-256 rounds of CPU; run
+# `manage.py bench_logins` to see the resulting logins/sec per worker before
+# changing it. Hashes made with fewer iterations are re-hashed on the next
+# login; stronger ones are left alone.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS') or 0) or None
+
+PASSWORD_HASHERS = [
+    'core.credentials.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blood-donation',
+    },
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ratelimit',
+    },
+}
+
+# How long request.donor / request.hospital are cached (core.middleware).
+# With the per-process cache above, an edit or deletion reaches the other
+# workers only when their copy expires; a shared cache makes it immediate.
+IDENTITY_CACHE_SECONDS = int(os.environ.get('IDENTITY_CACHE_SECONDS', '60'))
 
 # Sessions
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# "db" reads django_session on every request. "cached_db" serves reads from
+# the cache and writes through to the database, so sessions survive restarts;
+# it needs the default cache to be shared by all workers (Redis, Memcached).
+# With the per-process LocMemCache above, a logout on one worker would leave
+# the session cached on the others, so `manage.py check` refuses that
+# combination (core.E001).
+# "signed_cookies" keeps no server-side state at all (the session is readable
+# by the client, so only the logged-in email is stored there).
+# Pick one with the SESSION_MODE environment variable.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_MODE', 'db')]
 
 
 # Internationalization
@@ -121,7 +292,21 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = '/static/'
-STATICFILES_DIRS = [BASE_DIR / "static"]
+# Assets live in core/static (found by the app directories finder).
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# With DEBUG off, collectstatic writes fingerprinted, precompressed files that
+# core.assets.serve_asset serves with far-future cache headers. Run
+# `manage.py collectstatic` on every deploy.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'core.assets.PrecompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 
 # Default primary key field type
@@ -131,9 +316,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# cleanup_profile_pics leaves files younger than this alone: an upload is
+# stored before the donor row pointing at it commits
+PROFILE_PIC_CLEANUP_GRACE_SECONDS = int(os.environ.get('PROFILE_PIC_CLEANUP_GRACE_SECONDS', 3600))
 
 
-import os
 # Email configuration for sending notifications
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
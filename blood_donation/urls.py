@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from core.assets import serve_asset
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),
 ]
+
+# runserver serves static files itself while DEBUG is on
+if not settings.DEBUG:
+    urlpatterns.insert(0, path(f"{settings.STATIC_URL.strip('/')}/<path:path>", serve_asset))
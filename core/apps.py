@@ -8,5 +8,6 @@ class CoreConfig(AppConfig):
     def ready(self):
         try:
             import core.signals  # noqa: F401
+            import core.checks  # noqa: F401
         except Exception:
             pass
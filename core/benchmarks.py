@@ -0,0 +1,101 @@
+# core/benchmarks.py
+# Shared helpers for the bench_* management commands.
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database(on_disk=True):
+    """
+    Runs the block against a throwaway, migrated test database with test-mode
+    settings (locmem email backend, 'testserver' allowed), so benchmarks never
+    touch db.sqlite3. SQLite test databases live in memory by default, which
+    hides I/O cost, so they are put in a temp file unless on_disk=False.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    tmpdir = None
+    if on_disk and connection.vendor == 'sqlite':
+        tmpdir = tempfile.mkdtemp(prefix='bench-')
+        test_settings['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+        if tmpdir:
+            # WAL mode can leave -wal/-shm files next to the database
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples):
+    """Latency stats in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'per_sec': len(ordered) / total if total else 0.0,
+    }
+
+
+def time_calls(func, iterations, warmup=0):
+    """Calls func() warmup + iterations times and summarizes the timed ones."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def format_stats(label, stats):
+    return (
+        f"{label:<32} n={stats['n']:<6} mean={stats['mean_ms']:8.3f}ms "
+        f"p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms "
+        f"p99={stats['p99_ms']:8.3f}ms"
+    )
+
+
+def seed_benchmark_data(seed=42, donors=2000, hospitals=50, blood_requests=500, donor_requests=2000, donations=3000):
+    """
+    Fills the (throwaway) database with a reproducible dataset through
+    datagen, the same seed always giving the same rows. Requests all fall in
+    the last 24 hours, so the request list shows every one. Returns the
+    created hospitals.
+    """
+    from django.utils import timezone
+
+    from .datagen import seed_database
+    from .models import Hospital
+
+    hospital_ids = seed_database(
+        seed, now=timezone.now(), request_days=1, hospitals=hospitals, donors=donors, donations=donations,
+        blood_requests=blood_requests, donor_requests=donor_requests,
+    )
+    return list(Hospital.objects.filter(id__in=hospital_ids).order_by('id'))
@@ -0,0 +1,75 @@
+# core/changelog.py
+# "What changed" feed for clients that mirror blood stock and blood requests.
+# Every save/delete appends a ChangeLog row (core.signals), and /changes
+# hands them out in id order: a client stores the `next` cursor from each
+# response and asks for ?since=<cursor> next time, until `more` is false.
+# Start from since=0 for a full copy (the migration logged every existing
+# row as an upsert).
+#
+# The feed is public and request rows carry patient names and phone
+# numbers, so it mustn't outlive the rows: logging a delete drops the row's
+# earlier entries, and only the bare delete stays. A client past them still
+# gets the delete; one starting earlier never sees the row at all.
+#
+# Cursors are only safe as a high-water mark because SQLite commits one
+# writer at a time, so ids become visible in order. On a database with
+# concurrent writers, a lower id can commit after a higher one is read.
+
+from itertools import islice
+
+from .models import BloodRequest, BloodStock, ChangeLog
+
+# Model -> name used in the feed
+TRACKED = {BloodStock: 'stock', BloodRequest: 'request'}
+MAX_PAGE = 1000
+
+
+def row_data(instance):
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+    }
+
+
+def record_change(instance, action):
+    if action == 'delete':
+        ChangeLog.objects.filter(model=TRACKED[type(instance)], object_id=instance.pk).delete()
+    ChangeLog.objects.create(
+        model=TRACKED[type(instance)], object_id=instance.pk, action=action,
+        data=row_data(instance) if action == 'upsert' else None,
+    )
+
+
+def record_upserts(queryset, batch_size=2000):
+    """Logs an upsert for every row in `queryset`, for rows inserted without signals (datagen)."""
+    name = TRACKED[queryset.model]
+    fields = [field.attname for field in queryset.model._meta.concrete_fields]
+    entries = (
+        ChangeLog(model=name, object_id=row['id'], action='upsert', data=row)
+        for row in queryset.order_by('pk').values(*fields).iterator(chunk_size=batch_size)
+    )
+    while batch := list(islice(entries, batch_size)):
+        ChangeLog.objects.bulk_create(batch)
+
+
+def changes_since(cursor, limit=MAX_PAGE, model=None):
+    """
+    One page of the feed: (changes, next cursor, more). Several changes to the
+    same row within a page collapse into the latest, so a client applying the
+    page ends up in the same state with less to download.
+    """
+    entries = ChangeLog.objects.filter(pk__gt=cursor).order_by('pk')
+    if model:
+        entries = entries.filter(model=model)
+    page = list(entries.values_list('pk', 'model', 'object_id', 'action', 'data')[:limit + 1])
+    more = len(page) > limit
+    page = page[:limit]
+
+    latest = {}
+    for pk, name, object_id, action, data in page:
+        latest.pop((name, object_id), None)  # re-inserted, so dict order follows the latest change
+        change = {'c': pk, 'm': name, 'id': object_id, 'op': action[0]}
+        if data is not None:
+            change['d'] = data
+        latest[(name, object_id)] = change
+    return list(latest.values()), page[-1][0] if page else cursor, more
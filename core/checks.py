@@ -0,0 +1,28 @@
+# core/checks.py
+# System checks for settings combinations that work on one process but break
+# with several workers.
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    # Each worker has its own LocMemCache, so a logout on one worker would
+    # leave the session alive in the others' caches
+    if settings.SESSION_ENGINE not in CACHED_SESSION_ENGINES:
+        return []
+    backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']
+    if backend.endswith('LocMemCache'):
+        return [Error(
+            f"SESSION_ENGINE {settings.SESSION_ENGINE!r} needs a cache shared by all workers, "
+            f"but the {settings.SESSION_CACHE_ALIAS!r} cache is per-process local memory.",
+            hint="Use SESSION_MODE=db, or point the cache at Redis or Memcached.",
+            id='core.E001',
+        )]
+    return []
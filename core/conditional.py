@@ -0,0 +1,72 @@
+# core/conditional.py
+# Conditional GETs for the list pages clients keep polling (blood requests,
+# live stock, hospital directory). A version function returns cheap
+# aggregates over the rows the page shows -- MAX(updated_at) and COUNT(*)
+# per table, one indexed query each -- and those become the ETag, so an
+# unchanged page is answered with 304 Not Modified before anything is
+# rendered.
+#
+# The row count is what catches deletions and requests ageing out of the
+# 24h window, which leave MAX(updated_at) where it was. Last-Modified is
+# sent too, but it only sees edits; browsers send If-None-Match alongside
+# If-Modified-Since and Django checks the ETag first. Responses say
+# "Cache-Control: no-cache" so browsers revalidate on every poll instead of
+# guessing a freshness lifetime from Last-Modified.
+
+import hashlib
+import os
+from functools import lru_cache, wraps
+
+from django.db.models import Count, Max
+from django.template.loader import get_template
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+def table_version(queryset):
+    """(latest updated_at, row count) for the rows in queryset."""
+    version = queryset.order_by().aggregate(changed=Max('updated_at'), rows=Count('pk'))
+    return version['changed'], version['rows']
+
+
+@lru_cache(maxsize=None)
+def _template_version(template_name):
+    # A deploy that changes the template must not be answered with 304
+    origin = get_template(template_name).origin.name
+    return str(os.path.getmtime(origin))
+
+
+def conditional_list(template_name, version_func):
+    """
+    Serves a list view conditionally:
+
+        @conditional_list('live_stock.html', _live_stock_version)
+        def live_stock(request): ...
+
+    version_func(request) returns a tuple of (updated_at, count) pairs from
+    table_version(), plus anything else the page depends on (e.g. today's
+    date when it greys out expired stock). It runs once per request.
+    """
+    def versions(request):
+        if not hasattr(request, '_list_version'):
+            request._list_version = version_func(request)
+        return request._list_version
+
+    def etag(request, *args, **kwargs):
+        key = repr((_template_version(template_name), versions(request)))
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        changed = [v[0] for v in versions(request) if isinstance(v, tuple) and v[0]]
+        return max(changed) if changed else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+# core/credentials.py
+# Password hashing shared by Donor and Hospital.
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password, must_update_salt
+from django.utils.crypto import constant_time_compare
+
+
+# Donor passwords used to be stored as bare, unsalted sha256 hex digests
+LEGACY_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the work factor taken from settings.PASSWORD_HASH_ITERATIONS
+    (Django's default when unset). Keeps Django's algorithm name so existing
+    hashes still verify; hashes with fewer iterations are upgraded on the
+    next login, but stronger ones are never re-hashed down.
+    """
+    iterations = settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded['iterations'] < self.iterations or must_update_salt(decoded['salt'], self.salt_entropy)
+
+
+def hash_password(raw_password):
+    return make_password(raw_password)
+
+
+def reject_unknown_account(raw_password):
+    """
+    For logins with an email nobody has: spends the time a real check would,
+    so response times don't tell registered emails apart. Always False.
+    """
+    make_password(raw_password)
+    return False
+
+
+def verify_password(instance, raw_password):
+    """
+    Checks raw_password against instance.password. On success, legacy sha256
+    digests and hashes with an outdated work factor are re-hashed and saved.
+    """
+    encoded = instance.password or ''
+
+    def upgrade(raw):
+        instance.password = make_password(raw)
+        if instance.pk:
+            instance.save(update_fields=['password'])
+
+    if LEGACY_SHA256_RE.match(encoded):
+        if not constant_time_compare(hashlib.sha256(raw_password.encode()).hexdigest(), encoded):
+            return False
+        upgrade(raw_password)
+        return True
+
+    return check_password(raw_password, encoded, setter=upgrade)
+
+
+class PasswordMixin:
+    """set_password / check_password for models with a `password` column."""
+
+    def set_password(self, raw_password):
+        # No save here; callers save once with the rest of their changes
+        self.password = hash_password(raw_password)
+
+    def check_password(self, raw_password):
+        return verify_password(self, raw_password)
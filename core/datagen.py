@@ -0,0 +1,296 @@
+# core/datagen.py
+# Deterministic synthetic data for load testing. Generators yield plain tuples
+# (no model instances) which insert_rows() writes with executemany, so a
+# million rows is seconds of work rather than minutes. seed_database() puts
+# them together; used by `manage.py seed_data` and the bench_* commands.
+
+import random
+import time
+import uuid
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.crypto import RANDOM_STRING_CHARS
+
+from .changelog import record_upserts
+from .eligibility import FLAG_FIELDS, ineligibility_reasons
+from .models import BloodRequest, BloodStock, Donation, Donor, DonorHealthCheck, DonorRequest, Hospital
+from .rollups import run_rollup
+from .utils import BLOOD_GROUP_FREQUENCIES, BLOOD_TYPES, HOSPITAL_NAMES, KERALA_DISTRICTS
+
+GROUPS = list(BLOOD_GROUP_FREQUENCIES)
+_CUMULATIVE = list(accumulate(BLOOD_GROUP_FREQUENCIES.values()))
+FIRST_NAMES = [
+    "Arjun", "Anjali", "Rahul", "Lakshmi", "Vishnu", "Meera", "Akhil", "Divya",
+    "Nikhil", "Sreya", "Fathima", "Muhammed", "Aswin", "Gopika", "Joseph", "Ann",
+]
+LAST_NAMES = ["Nair", "Menon", "Pillai", "Kurian", "Thomas", "Varghese", "Rahman", "Das", "Krishnan", "Joseph"]
+
+# Shared by every seeded account, so login benchmarks can sign in as anyone
+SEED_PASSWORD = 'seed-password'
+
+# Only these need converting before they reach the driver
+_ADAPTED_TYPES = {'DateField', 'DateTimeField', 'UUIDField'}
+
+
+def _rng(seed, stream):
+    # One independent stream per table, so changing one count never
+    # changes the rows generated for another table
+    return random.Random(f"{seed}:{stream}")
+
+
+def _blood_group(rng):
+    return GROUPS[bisect(_CUMULATIVE, rng.random() * _CUMULATIVE[-1])]
+
+
+def insert_rows(model, field_names, rows, using=DEFAULT_DB_ALIAS):
+    """
+    INSERTs tuples (values in `field_names` order) with a single executemany.
+    Skips model __init__, save() and signals, and keeps auto_now values as
+    given. Fields not listed get their model default. Returns the row count.
+    """
+    connection = connections[using]
+    listed = [model._meta.get_field(name) for name in field_names]
+    missing = [
+        f for f in model._meta.concrete_fields
+        if f not in listed and not f.primary_key
+    ]
+    fields = listed + missing
+    adapted = [
+        (i, f) for i, f in enumerate(fields) if f.get_internal_type() in _ADAPTED_TYPES
+    ]
+    defaults = tuple(f.get_default() for f in missing)
+    callable_defaults = any(callable(f.default) for f in missing)
+
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(model._meta.db_table),
+        ", ".join(connection.ops.quote_name(f.column) for f in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+
+    def prepare(row):
+        values = list(row)
+        if callable_defaults:
+            values.extend(f.get_default() for f in missing)
+        else:
+            values.extend(defaults)
+        for i, field in adapted:
+            if values[i] is not None:
+                values[i] = field.get_db_prep_save(values[i], connection)
+        return values
+
+    params = [prepare(row) for row in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+    return len(params)
+
+
+# Each generator yields `count` rows from its own random stream, in the
+# order of the matching *_FIELDS tuple. Callers slice them into chunks, so
+# the output doesn't depend on the chunk size.
+
+HOSPITAL_FIELDS = ('name', 'email', 'phone', 'location', 'password', 'updated_at')
+
+
+def hospitals(seed, count, password, now):
+    rng = _rng(seed, 'hospitals')
+    for i in range(count):
+        base = HOSPITAL_NAMES[i % len(HOSPITAL_NAMES)]
+        district = rng.choice(KERALA_DISTRICTS)
+        name = base if i < len(HOSPITAL_NAMES) else f"{base} {district} {i}"
+        yield (name, f"hospital{i}@seed.example", f"0495{i:07d}", district, password, now)
+
+
+STOCK_FIELDS = ('hospital', 'blood_type', 'units', 'expiry_date', 'updated_at')
+
+
+def blood_stock(seed, hospital_ids, today, now):
+    rng = _rng(seed, 'stock')
+    for hospital_id in hospital_ids:
+        for blood_type in BLOOD_TYPES:
+            # Rare groups are stocked in proportion to how often they occur
+            scale = BLOOD_GROUP_FREQUENCIES[blood_type] / 10
+            units = int(rng.expovariate(1 / max(scale * 8, 0.5)))
+            yield (hospital_id, blood_type, units, today + timedelta(days=rng.randint(-7, 42)), now)
+
+
+DONOR_FIELDS = (
+    'name', 'email', 'phone', 'age', 'gender', 'state', 'district', 'location',
+    'blood_group', 'available', 'last_donation_date', 'password', 'is_verified',
+    'verification_token', 'total_donations', 'badge',
+)
+
+
+def donors(seed, count, password, today):
+    rng = _rng(seed, 'donors')
+    random_, getrandbits = rng.random, rng.getrandbits
+    names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    n_names, n_districts = len(names), len(KERALA_DISTRICTS)
+    # Precomputed so the loop does no date arithmetic
+    recent = [today - timedelta(days=d) for d in range(721)]
+    for i in range(count):
+        donated = random_() < 0.6
+        total = 1 + int(random_() * 12) if donated else 0
+        yield (
+            names[int(random_() * n_names)], f"donor{i}@seed.example", f"9{i:09d}",
+            18 + int(random_() * 48), 'Female' if random_() < 0.45 else 'Male',
+            'Kerala', KERALA_DISTRICTS[int(random_() * n_districts)], '',
+            _blood_group(rng), random_() < 0.8,
+            recent[int(random_() * 721)] if donated else None,
+            password, True, uuid.UUID(int=getrandbits(128), version=4),
+            total, _badge(total),
+        )
+
+
+def _badge(total):
+    # Same thresholds as Donor.update_badge
+    if total >= 10:
+        return "Hero"
+    if total >= 5:
+        return "Life Saver"
+    if total >= 2:
+        return "Regular Donor"
+    return "New Donor"
+
+
+DONATION_FIELDS = ('donor', 'date', 'location')
+
+
+def donations(seed, count, donor_ids, today):
+    rng = _rng(seed, 'donations')
+    low, high = donor_ids
+    for _ in range(count):
+        yield (
+            rng.randint(low, high),
+            today - timedelta(days=rng.randint(0, 720)),
+            rng.choice(KERALA_DISTRICTS),
+        )
+
+
+REQUEST_FIELDS = (
+    'patient_name', 'hospital_name', 'blood_group_needed', 'location', 'contact_number',
+    'age', 'gender', 'state', 'district', 'status', 'urgent', 'created_at', 'updated_at',
+)
+
+
+def blood_requests(seed, count, now, days=365):
+    rng = _rng(seed, 'requests')
+    for i in range(count):
+        created = now - timedelta(seconds=rng.randint(0, days * 86400 - 1))
+        yield (
+            f"Patient {i}", rng.choice(HOSPITAL_NAMES), _blood_group(rng), '',
+            f"8{i:09d}", rng.randint(1, 90), rng.choice(['Male', 'Female']),
+            'Kerala', rng.choice(KERALA_DISTRICTS),
+            # The only status the app sets
+            'pending', rng.random() < 0.1,
+            created, created,
+        )
+
+
+DONOR_REQUEST_FIELDS = (
+    'hospital', 'donor_name', 'donor_age', 'donor_blood_group', 'donor_contact', 'status', 'created_at', 'updated_at',
+)
+
+
+def donor_requests(seed, count, hospital_ids, now):
+    rng = _rng(seed, 'donor_requests')
+    names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    for i in range(count):
+        created = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        yield (
+            rng.choice(hospital_ids), rng.choice(names), rng.randint(18, 65), _blood_group(rng),
+            f"7{i:09d}", rng.choice(['Pending', 'Pending', 'Accepted', 'Rejected']), created, created,
+        )
+
+
+HEALTH_CHECK_FIELDS = ('donor', 'checked_at', 'age', 'weight', 'hemoglobin_level', *FLAG_FIELDS, 'eligible')
+
+
+def health_checks(seed, count, donor_ids, now):
+    rng = _rng(seed, 'health')
+    low, high = donor_ids
+    for _ in range(count):
+        values = {
+            'age': rng.randint(17, 68),
+            'weight': round(rng.gauss(64, 11), 1),
+            'hemoglobin_level': round(rng.gauss(13.6, 1.2), 1),
+            **{field: rng.random() < 0.03 for field in FLAG_FIELDS},
+        }
+        yield (
+            rng.randint(low, high) if high else None,
+            now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+            *values.values(),
+            not ineligibility_reasons(values),
+        )
+
+
+SEED_COUNTS = ('hospitals', 'donors', 'donations', 'blood_requests', 'donor_requests', 'health_checks')
+
+
+def seed_database(seed, now=None, request_days=365, chunk_size=20000, report=None, **counts):
+    """
+    Appends `seed`'s rows to the database, `chunk_size` rows per transaction,
+    and returns the new hospitals' ids. Row counts are given by table (see
+    SEED_COUNTS, default 0); report(model, rows, seconds) is called after
+    each table. Timestamps go back from `now`, by default today's midnight
+    so that reruns on the same day match.
+
+    insert_rows() skips signals, so afterwards the new stock and requests are
+    logged to the change feed and the rollups are brought up to date, as if
+    the rows had been saved one by one.
+    """
+    unknown = set(counts) - set(SEED_COUNTS)
+    if unknown:
+        raise TypeError(f"Unknown tables: {', '.join(sorted(unknown))}")
+    n = dict.fromkeys(SEED_COUNTS, 0) | counts
+    now = now or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    today = timezone.localdate()
+    # Hashing is ~100ms per call at the configured iterations; doing it
+    # per row would take longer than the whole load. The salt comes from
+    # the seed too (22 chars is what the hashers consider strong enough)
+    salt = ''.join(random.Random(seed).choices(RANDOM_STRING_CHARS, k=22))
+    password = make_password(SEED_PASSWORD, salt)
+
+    def max_id(model):
+        return model.objects.aggregate(m=Max('id'))['m'] or 0
+
+    def load(model, field_names, rows):
+        started = time.perf_counter()
+        total = 0
+        while batch := list(islice(rows, chunk_size)):
+            with transaction.atomic():
+                total += insert_rows(model, field_names, batch)
+        if total and report:
+            report(model, total, time.perf_counter() - started)
+
+    first_hospital, first_stock, first_request = max_id(Hospital), max_id(BloodStock), max_id(BloodRequest)
+    load(Hospital, HOSPITAL_FIELDS, hospitals(seed, n['hospitals'], password, now))
+    hospital_ids = list(Hospital.objects.filter(id__gt=first_hospital).values_list('id', flat=True))
+    load(BloodStock, STOCK_FIELDS, blood_stock(seed, hospital_ids, today, now))
+
+    # Ids are handed out sequentially, so the new donors are exactly the
+    # range after the old max; related rows sample from it directly
+    # instead of holding a million donors in memory
+    first_donor = max_id(Donor)
+    load(Donor, DONOR_FIELDS, donors(seed, n['donors'], password, today))
+    last_donor = max_id(Donor)
+    donor_ids = (first_donor + 1, last_donor) if last_donor > first_donor else (0, 0)
+
+    if n['donations'] and not donor_ids[1]:
+        raise ValueError("Donations need at least one seeded donor.")
+    if n['donor_requests'] and not hospital_ids:
+        raise ValueError("Donor requests need at least one seeded hospital.")
+    load(Donation, DONATION_FIELDS, donations(seed, n['donations'], donor_ids, today))
+    load(BloodRequest, REQUEST_FIELDS, blood_requests(seed, n['blood_requests'], now, request_days))
+    load(DonorRequest, DONOR_REQUEST_FIELDS, donor_requests(seed, n['donor_requests'], hospital_ids, now))
+    load(DonorHealthCheck, HEALTH_CHECK_FIELDS, health_checks(seed, n['health_checks'], donor_ids, now))
+
+    record_upserts(BloodStock.objects.filter(id__gt=first_stock))
+    record_upserts(BloodRequest.objects.filter(id__gt=first_request))
+    run_rollup()
+    return hospital_ids
@@ -0,0 +1,135 @@
+# core/eligibility.py
+# Blood donation eligibility rules, shared by the health-check form/view, the
+# questionnaire template and the batch screening command.
+
+import operator
+
+# Each rule is a condition the answer must meet to donate:
+#   (field, operator, threshold, reason shown when it is not met)
+# Blank numeric answers are skipped here and left to field validation.
+RULES = [
+    ('age', '>=', 18, "Age must be between 18 and 65."),
+    ('age', '<=', 65, "Age must be between 18 and 65."),
+    ('weight', '>=', 50, "Minimum weight should be 50 kg."),
+    ('hemoglobin_level', '>=', 12.5, "Hemoglobin must be at least 12.5 g/dL."),
+    ('recent_illness', '!=', True, "Recent illness in the last 2 weeks."),
+    ('medication', '!=', True, "Currently taking medication."),
+    ('alcohol_24h', '!=', True, "Alcohol in the last 24 hours."),
+    ('smoking', '!=', True, "Smoked in the last 24 hours."),
+    ('tattoo_6m', '!=', True, "Tattoo or piercing in the last 6 months."),
+    ('surgery_6m', '!=', True, "Surgery in the last 6 months."),
+    ('chronic_disease', '!=', True, "Chronic disease."),
+    ('pregnant', '!=', True, "Currently pregnant."),
+    ('covid_recent', '!=', True, "COVID-19 positive in the last 28 days."),
+    ('travel_malaria', '!=', True, "Travel to a malaria-prone area in the last 3 months."),
+]
+
+OPERATORS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+# Yes/no questions are the rules compared against True; the rest are numbers
+FLAG_FIELDS = _unique(field for field, _, threshold, _ in RULES if threshold is True)
+NUMERIC_FIELDS = _unique(field for field, _, _, _ in RULES if field not in FLAG_FIELDS)
+
+
+def _bounds(rules):
+    # Strict comparisons have no HTML equivalent and are left to the server
+    bounds = {field: {} for field in NUMERIC_FIELDS}
+    for field, op, threshold, _ in rules:
+        if op in ('>=', '<=') and field in bounds:
+            bounds[field]['min' if op == '>=' else 'max'] = threshold
+    return bounds
+
+
+# Inclusive limits per number, for the questionnaire's min/max attributes:
+# {'age': {'min': 18, 'max': 65}, ...}
+BOUNDS = _bounds(RULES)
+
+
+def _compile(rules):
+    """
+    Turns the rule table into one straight-line Python function, so a check
+    is a handful of comparisons with no per-rule dispatch. Every field is
+    read once, and consecutive rules on the same field with the same reason
+    (like the age range) become a single test, so reasons never repeat.
+    """
+    lines = ['def evaluate(values):', '    get = values.get', '    reasons = []']
+    constants = {}
+    groups = []  # [field, reason, [condition, ...]]
+    for i, (field, op, threshold, reason) in enumerate(rules):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r} in eligibility rule for {field!r}")
+        if not field.isidentifier():
+            raise ValueError(f"Invalid field name {field!r} in eligibility rules")
+        constants[f'T{i}'] = threshold
+        if groups and groups[-1][:2] == [field, reason]:
+            groups[-1][2].append(f'{field} {op} T{i}')
+        else:
+            groups.append([field, reason, [f'{field} {op} T{i}']])
+
+    seen = set()
+    for j, (field, reason, conditions) in enumerate(groups):
+        constants[f'R{j}'] = reason
+        if field not in seen:
+            lines.append(f'    {field} = get({field!r})')
+            seen.add(field)
+        test = f"not ({' and '.join(conditions)})"
+        if field not in FLAG_FIELDS:
+            # None and False both count as "no" for flags; blank numbers are skipped
+            test = f'{field} is not None and {test}'
+        lines.append(f'    if {test}: reasons.append(R{j})')
+    lines.append('    return reasons')
+
+    namespace = dict(constants)
+    exec(compile('\n'.join(lines), '<eligibility rules>', 'exec'), namespace)
+    return namespace['evaluate']
+
+
+# Compiled once at import
+ineligibility_reasons = _compile(RULES)
+ineligibility_reasons.__doc__ = """
+Returns every reason the given answers fail the rules (empty = eligible).
+`values` is any mapping of field name to value: form cleaned_data, or a
+dict built from a DonorHealthCheck.
+"""
+
+
+def screen_columns(columns):
+    """
+    Vectorized RULES over a whole batch. `columns` maps every field in
+    NUMERIC_FIELDS and FLAG_FIELDS to a NumPy array (float with NaN for
+    blanks; bool for flags). Returns (eligible, reasons): a bool array and a
+    list of reason lists matching ineligibility_reasons row for row.
+    """
+    import numpy as np
+
+    size = len(columns[NUMERIC_FIELDS[0]])
+    failed = []  # (bool mask of failing rows, reason) per rule
+    for field, op, threshold, reason in RULES:
+        value = columns[field]
+        mask = ~OPERATORS[op](value, threshold)
+        if value.dtype.kind == 'f':
+            mask &= ~np.isnan(value)
+        failed.append((mask, reason))
+
+    masks = np.vstack([mask for mask, _ in failed])
+    eligible = ~masks.any(axis=0)
+
+    reasons = [[] for _ in range(size)]
+    for mask, reason in failed:
+        # Only rows that fail this rule are touched in Python
+        for row in np.flatnonzero(mask):
+            if reason not in reasons[row]:
+                reasons[row].append(reason)
+    return eligible, reasons
@@ -0,0 +1,99 @@
+# core/exports.py
+# Full-table exports as CSV or JSON Lines, optionally gzipped, produced as a
+# stream of byte chunks: rows come from .values().iterator(chunk_size), so
+# memory stays flat however big the table is. Served by views.export_data and
+# written to files by `manage.py export_data`.
+#
+# Under ASGI, Django reads a sync iterator given to StreamingHttpResponse
+# into a list first, so the view wraps the stream in aiter_export(), which
+# pulls one chunk at a time instead.
+
+import csv
+import io
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from .models import BloodRequest, BloodStock, Donation, Donor
+
+# name: (model, exported fields, field the from/to dates filter on)
+EXPORTS = {
+    'donors': (Donor, [
+        'id', 'name', 'email', 'phone', 'age', 'gender', 'blood_group', 'state', 'district', 'location',
+        'available', 'last_donation_date', 'total_donations', 'badge', 'is_verified',
+    ], 'last_donation_date'),
+    'donations': (Donation, ['id', 'donor_id', 'date', 'location'], 'date'),
+    'blood_requests': (BloodRequest, [
+        'id', 'patient_name', 'hospital_name', 'blood_group_needed', 'age', 'gender', 'state', 'district',
+        'location', 'contact_number', 'status', 'urgent', 'created_at',
+    ], 'created_at'),
+    'blood_stock': (BloodStock, ['id', 'hospital_id', 'blood_type', 'units', 'expiry_date'], 'expiry_date'),
+}
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+CHUNK_SIZE = 2000
+
+
+def export_queryset(name, start=None, end=None, hospital=None):
+    """The rows to export, oldest first; start/end are inclusive dates."""
+    model, fields, date_field = EXPORTS[name]
+    qs = model.objects.order_by('pk')
+    # Compare dates, not datetimes, so a day means the local day
+    lookup = date_field + ('__date' if isinstance(model._meta.get_field(date_field), models.DateTimeField) else '')
+    if start:
+        qs = qs.filter(**{f"{lookup}__gte": start})
+    if end:
+        qs = qs.filter(**{f"{lookup}__lte": end})
+    if hospital is not None and name == 'blood_stock':
+        qs = qs.filter(hospital=hospital)
+    return qs.values(*fields)
+
+
+def _encode(fmt, fields, rows):
+    """Yields text, one block per CHUNK_SIZE rows."""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        write = lambda row: writer.writerow(row.values())  # noqa: E731
+    else:
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+        write = lambda row: buffer.write(encoder.encode(row) + "\n")  # noqa: E731
+
+    for i, row in enumerate(rows, 1):
+        write(row)
+        if i % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_export(name, fmt='csv', compress=False, start=None, end=None, hospital=None):
+    """Yields the export as bytes, gzipped on the fly when compress is set."""
+    fields = EXPORTS[name][1]
+    rows = export_queryset(name, start, end, hospital).iterator(chunk_size=CHUNK_SIZE)
+    if not compress:
+        for text in _encode(fmt, fields, rows):
+            yield text.encode()
+        return
+    # wbits=31 makes it a gzip file rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for text in _encode(fmt, fields, rows):
+        data = compressor.compress(text.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aiter_export(chunks):
+    """Async version of a stream_export() iterator, for ASGI responses."""
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def export_filename(name, fmt, compress):
+    return f"{name}-{timezone.localdate():%Y%m%d}.{fmt}{'.gz' if compress else ''}"
@@ -1,5 +1,6 @@
 from django import forms
 from .models import DonorHealthCheck
+from .eligibility import BOUNDS, ineligibility_reasons
 
 
 class DetailedHealthCheckForm(forms.ModelForm):
@@ -7,24 +8,16 @@ class DetailedHealthCheckForm(forms.ModelForm):
         model = DonorHealthCheck
         exclude = ['donor', 'eligible', 'checked_at']
         widgets = {
-            'age': forms.NumberInput(attrs={'min': 18, 'max': 65, 'class': 'border rounded-lg p-2 w-full'}),
-            'weight': forms.NumberInput(attrs={'min': 45, 'class': 'border rounded-lg p-2 w-full'}),
-            'hemoglobin_level': forms.NumberInput(attrs={'step': 0.1, 'min': 10, 'class': 'border rounded-lg p-2 w-full'}),
+            'age': forms.NumberInput(attrs={**BOUNDS['age'], 'class': 'border rounded-lg p-2 w-full'}),
+            'weight': forms.NumberInput(attrs={**BOUNDS['weight'], 'class': 'border rounded-lg p-2 w-full'}),
+            'hemoglobin_level': forms.NumberInput(attrs={'step': 0.1, **BOUNDS['hemoglobin_level'], 'class': 'border rounded-lg p-2 w-full'}),
             'recent_illness': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'medication': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'chronic_disease': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'high_blood_pressure': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'diabetes': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'heart_disease': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'surgery_6m': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'iron_deficiency': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'infectious_disease': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'recent_dental': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'recent_vaccination': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'alcohol_24h': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'smoking': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'tattoo_6m': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
-            'recent_piercing': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'travel_malaria': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'pregnant': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
             'covid_recent': forms.RadioSelect(choices=[(True, "Yes"), (False, "No")]),
@@ -32,34 +25,10 @@ class DetailedHealthCheckForm(forms.ModelForm):
 
     def clean(self):
         cleaned_data = super().clean()
-        age = cleaned_data.get("age")
-        weight = cleaned_data.get("weight")
-        hemoglobin = cleaned_data.get("hemoglobin_level")
-
-        # Disqualifying factors
-        issues = [
-            cleaned_data.get("recent_illness"),
-            cleaned_data.get("medication"),
-            cleaned_data.get("alcohol_24h"),
-            cleaned_data.get("smoking"),
-            cleaned_data.get("tattoo_6m"),
-            cleaned_data.get("surgery_6m"),
-            cleaned_data.get("chronic_disease"),
-            cleaned_data.get("pregnant"),
-            cleaned_data.get("covid_recent"),
-            cleaned_data.get("travel_malaria"),
-        ]
-
-        if age and (age < 18 or age > 65):
-            raise forms.ValidationError("Age must be between 18 and 65.")
-        if weight and weight < 50:
-            raise forms.ValidationError("Minimum weight should be 50 kg.")
-        if hemoglobin and hemoglobin < 12.5:
-            raise forms.ValidationError("Hemoglobin must be at least 12.5 g/dL.")
-
-        if any(issues):
-            raise forms.ValidationError("You are not eligible to donate at this time due to health reasons.")
-
+        # Same rules as check_eligibility and the batch screening command
+        reasons = ineligibility_reasons(cleaned_data)
+        if reasons:
+            raise forms.ValidationError(reasons)
         return cleaned_data
 
 
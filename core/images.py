@@ -0,0 +1,104 @@
+# core/images.py
+# Profile picture storage: content-addressed originals plus small WebP
+# variants that templates serve instead of the full-size upload.
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PIC_DIR = 'profile_pics'
+VARIANT_DIR = f'{PROFILE_PIC_DIR}/variants'
+
+# name -> square size in px. "thumb" is the 140px profile circle at 2x;
+# add a size here only once a template shows it.
+PROFILE_PIC_VARIANTS = {
+    'thumb': 280,
+}
+
+# Variants are rendered on a single background thread, never on the request
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profile-pics')
+
+
+def content_hash(uploaded_file):
+    """sha256 of an upload, read in chunks so large files never sit in memory."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def store_profile_pic(uploaded_file):
+    """
+    Saves the upload under a name derived from its content and returns that
+    name. Identical uploads map to the same file, which is stored only once.
+    """
+    digest = content_hash(uploaded_file)
+    ext = os.path.splitext(uploaded_file.name)[1].lower()[:10]
+    name = f'{PROFILE_PIC_DIR}/{digest[:2]}/{digest}{ext}'
+    if not default_storage.exists(name):
+        # Storage.save() copies the upload chunk by chunk
+        name = default_storage.save(name, uploaded_file)
+    else:
+        # Reused file: restart cleanup_profile_pics' grace period, as it may
+        # be an orphan the donor row about to be saved will point at again
+        try:
+            os.utime(default_storage.path(name))
+        except NotImplementedError:
+            pass
+    return name
+
+
+def variant_name(original_name, variant):
+    digest = os.path.splitext(os.path.basename(original_name))[0]
+    return f'{VARIANT_DIR}/{digest}_{variant}.webp'
+
+
+def variant_url(original_name, variant):
+    """URL of a ready variant, or None while it hasn't been generated yet."""
+    name = variant_name(original_name, variant)
+    return default_storage.url(name) if default_storage.exists(name) else None
+
+
+def generate_variants(original_name):
+    """Renders every missing variant of one stored original. Returns how many were made."""
+    from PIL import Image, ImageOps
+
+    missing = {
+        variant: size for variant, size in PROFILE_PIC_VARIANTS.items()
+        if not default_storage.exists(variant_name(original_name, variant))
+    }
+    if not missing:
+        return 0
+
+    with default_storage.open(original_name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    for variant, size in missing.items():
+        thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        out = ContentFile(b'')
+        thumb.save(out, 'WEBP', quality=80, method=4)
+        out.seek(0)
+        default_storage.save(variant_name(original_name, variant), out)
+    return len(missing)
+
+
+def _generate_quietly(original_name):
+    try:
+        generate_variants(original_name)
+    except Exception:
+        # Unreadable formats (e.g. HEIC without a plugin) keep the original
+        logger.exception("Could not create variants for %s", original_name)
+
+
+def schedule_variants(original_name):
+    """Queues variant generation once the current transaction commits."""
+    transaction.on_commit(lambda: _executor.submit(_generate_quietly, original_name))
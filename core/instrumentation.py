@@ -0,0 +1,135 @@
+# core/instrumentation.py
+# Per-view SQL query accounting, used by QueryInstrumentationMiddleware, the
+# query metrics page and QueryBudgetMixin in core/testing.py.
+
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+
+SLOWEST_KEPT = 5
+DUPLICATES_KEPT = 5
+
+
+def query_budget(max_queries):
+    """
+    Declares how many SQL queries a view may issue per request:
+
+        @query_budget(4)
+        def live_stock(request): ...
+
+    Over-budget requests are flagged by the instrumentation middleware, and
+    QueryBudgetMixin.assertWithinQueryBudget fails on them in tests.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(view):
+    return getattr(view, 'query_budget', None)
+
+
+class QueryRecorder:
+    """
+    Collects every query run on any database alias while active, through
+    connection.execute_wrapper(), so it works with DEBUG off.
+    """
+
+    def __init__(self):
+        self.queries = []  # (sql, duration in seconds)
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def slowest(self, n=SLOWEST_KEPT):
+        return sorted(self.queries, key=lambda q: q[1], reverse=True)[:n]
+
+    def duplicates(self):
+        """SQL statements (with placeholders) issued more than once -- usually an N+1."""
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: n for sql, n in counts.items() if n > 1}
+
+
+class ViewQueryStats:
+    """Running per-view totals kept in process memory."""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_time = 0.0
+        self.over_budget = 0
+        self.slowest = []               # (duration, sql), longest first
+        self.duplicates = Counter()     # sql -> highest repeat count seen
+
+    def add(self, recorder, budget):
+        self.requests += 1
+        self.queries += recorder.count
+        self.max_queries = max(self.max_queries, recorder.count)
+        self.sql_time += recorder.total_time
+        if budget is not None and recorder.count > budget:
+            self.over_budget += 1
+        merged = self.slowest + [(duration, sql) for sql, duration in recorder.slowest()]
+        self.slowest = sorted(merged, reverse=True)[:SLOWEST_KEPT]
+        for sql, n in recorder.duplicates().items():
+            self.duplicates[sql] = max(self.duplicates[sql], n)
+
+    def as_dict(self, view_name):
+        return {
+            'view': view_name,
+            'requests': self.requests,
+            'avg_queries': self.queries / self.requests if self.requests else 0,
+            'max_queries': self.max_queries,
+            'avg_sql_ms': self.sql_time / self.requests * 1000 if self.requests else 0,
+            'over_budget': self.over_budget,
+            'slowest': [(duration * 1000, sql) for duration, sql in self.slowest],
+            'duplicates': self.duplicates.most_common(DUPLICATES_KEPT),
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record_view_queries(view_name, recorder, budget=None):
+    with _stats_lock:
+        _stats.setdefault(view_name, ViewQueryStats()).add(recorder, budget)
+
+
+def view_query_stats():
+    """Snapshot of the per-view totals, most queries per request first."""
+    with _stats_lock:
+        rows = [stats.as_dict(name) for name, stats in _stats.items()]
+    return sorted(rows, key=lambda row: row['avg_queries'], reverse=True)
+
+
+def reset_view_query_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, seed_benchmark_data, summarize
+
+ENDPOINTS = {
+    'home': lambda: reverse('home'),
+    'search_donors': lambda: reverse('search_donors') + '?blood_group=O%2B&district=Kozhikode',
+    'request_blood': lambda: reverse('request_blood'),
+    'feedback': lambda: reverse('feedback'),
+}
+
+
+class SlowBackend:
+    """Execute wrapper that sleeps before every query, like a database across a slow network."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = (
+        'Drives the async views through the WSGI and the ASGI handler in-process, '
+        'with a simulated slow database, and reports throughput and latency as '
+        'the number of concurrent clients grows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', nargs='+', default=list(ENDPOINTS), choices=list(ENDPOINTS))
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64], help='Concurrent clients to try.')
+        parser.add_argument('--requests', type=int, default=128, help='Requests per endpoint and concurrency level.')
+        parser.add_argument('--threads', type=int, default=4, help='WSGI worker threads, like gunicorn --threads (default: 4).')
+        parser.add_argument('--latency', type=float, default=20.0, help='Milliseconds added to every query (default: 20).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError("--threads and --concurrency must be at least 1.")
+
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), benchmark_database():
+            seed_benchmark_data(seed=options['seed'], donors=2000, hospitals=50)
+            # Every request's connection is opened in a worker thread
+            connection.close()
+
+            slow = SlowBackend(options['latency'] / 1000)
+            connection_created.connect(slow.install)
+            try:
+                wsgi, asgi = get_wsgi_application(), get_asgi_application()
+                self.stdout.write(
+                    f"{options['latency']:g}ms per query; WSGI with {options['threads']} worker thread(s), "
+                    f"ASGI on one event loop\n"
+                )
+                self.stdout.write(
+                    f"{'endpoint':<16}{'clients':>8}{'wsgi rps':>10}{'p50 ms':>9}{'p95 ms':>9}"
+                    f"{'asgi rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"
+                )
+                for name in options['endpoints']:
+                    path = ENDPOINTS[name]()
+                    for clients in options['concurrency']:
+                        w = self.run_wsgi(wsgi, path, clients, options)
+                        a = self.run_asgi_without_persistent_connections(asgi, path, clients, options['requests'])
+                        self.stdout.write(
+                            f"{name:<16}{clients:>8}{w['rps']:10.1f}{w['p50_ms']:9.1f}{w['p95_ms']:9.1f}"
+                            f"{a['rps']:10.1f}{a['p50_ms']:9.1f}{a['p95_ms']:9.1f}{w['errors'] + a['errors']:8d}"
+                        )
+            finally:
+                connection_created.disconnect(slow.install)
+                connections.close_all()
+
+    def run_wsgi(self, app, path, clients, options):
+        """Closed loop: each client sends its next request when the last one returns, queueing for a worker thread."""
+        factory = RequestFactory()
+        per_client = max(1, options['requests'] // clients)
+        samples, errors = [], []
+        lock = threading.Lock()
+
+        def call():
+            status = []
+            response = app(factory.get(path).environ, lambda s, headers, exc_info=None: status.append(s))
+            try:
+                b''.join(response)
+            finally:
+                response.close()  # request_finished, as a real server would
+            return int(status[0].split()[0])
+
+        def client(pool):
+            own, failed = [], 0
+            for _ in range(per_client):
+                start = time.perf_counter()
+                if pool.submit(call).result() >= 400:
+                    failed += 1
+                own.append(time.perf_counter() - start)
+            with lock:
+                samples.extend(own)
+                errors.append(failed)
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            threads = [threading.Thread(target=client, args=(pool,)) for _ in range(clients)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+        return self._result(samples, sum(errors), wall)
+
+    def run_asgi_without_persistent_connections(self, app, path, clients, requests):
+        # As settings does when served by blood_donation.asgi
+        db_settings = connections.settings['default']
+        conn_max_age, db_settings['CONN_MAX_AGE'] = db_settings['CONN_MAX_AGE'], 0
+        try:
+            return asyncio.run(self.run_asgi(app, path, clients, requests))
+        finally:
+            db_settings['CONN_MAX_AGE'] = conn_max_age
+
+    async def run_asgi(self, app, path, clients, requests):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': url.path, 'raw_path': url.path.encode(),
+            'query_string': url.query.encode(), 'root_path': '',
+            'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        per_client = max(1, requests // clients)
+        samples, errors = [], 0
+
+        async def call():
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+            never = asyncio.Event()
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await never.wait()  # the client never disconnects
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            await app(dict(scope), receive, send)
+            return status[0]
+
+        async def client():
+            nonlocal errors
+            for _ in range(per_client):
+                start = time.perf_counter()
+                if await call() >= 400:
+                    errors += 1
+                samples.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return self._result(samples, errors, time.perf_counter() - started)
+
+    def _result(self, samples, errors, wall):
+        stats = summarize(samples)
+        return {
+            'rps': stats['n'] / wall if wall else 0.0,
+            'p50_ms': stats['p50_ms'],
+            'p95_ms': stats['p95_ms'],
+            'errors': errors,
+        }
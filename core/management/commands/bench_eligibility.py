@@ -0,0 +1,62 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from core.eligibility import FLAG_FIELDS, NUMERIC_FIELDS, OPERATORS, RULES, ineligibility_reasons, screen_columns
+
+
+def interpreted_reasons(values):
+    """The rule table walked generically, for comparison with the compiled evaluator."""
+    reasons = []
+    for field, op, threshold, reason in RULES:
+        value = values.get(field)
+        if value is None and field not in FLAG_FIELDS:
+            continue
+        if not OPERATORS[op](value, threshold) and reason not in reasons:
+            reasons.append(reason)
+    return reasons
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of eligibility rule evaluation, per check and per batch row.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=100_000, help='Evaluations per timing run.')
+        parser.add_argument('--batch-rows', type=int, default=10_000, help='Rows for the vectorized batch timing.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        number = options['number']
+
+        def sample():
+            values = {'age': rng.randint(16, 70), 'weight': rng.uniform(40, 100), 'hemoglobin_level': rng.uniform(11, 16)}
+            values.update({field: rng.random() < 0.05 for field in FLAG_FIELDS})
+            return values
+
+        eligible = {'age': 30, 'weight': 70.0, 'hemoglobin_level': 14.0, **{field: False for field in FLAG_FIELDS}}
+        failing = {'age': 70, 'weight': 40.0, 'hemoglobin_level': 11.0, **{field: True for field in FLAG_FIELDS}}
+        for label, values in (('eligible answers', eligible), ('every rule failing', failing)):
+            assert ineligibility_reasons(values) == interpreted_reasons(values)
+            for name, func in (('compiled', ineligibility_reasons), ('interpreted', interpreted_reasons)):
+                best = min(timeit.repeat(lambda: func(values), number=number, repeat=5))
+                self.stdout.write(f"{name:<12} {label:<20} {best / number * 1e9:8.0f} ns/check")
+
+        try:
+            import numpy as np
+        except ImportError:
+            self.stdout.write("NumPy not installed; skipping the batch timing.")
+            return
+
+        rows = [sample() for _ in range(options['batch_rows'])]
+        columns = {field: np.array([row[field] for row in rows], dtype=float) for field in NUMERIC_FIELDS}
+        columns.update({field: np.array([row[field] for row in rows], dtype=bool) for field in FLAG_FIELDS})
+
+        _, batch_reasons = screen_columns(columns)
+        assert batch_reasons == [ineligibility_reasons(row) for row in rows]
+
+        best = min(timeit.repeat(lambda: screen_columns(columns), number=3, repeat=3)) / 3
+        self.stdout.write(f"{'vectorized':<12} {'batch':<20} {best / len(rows) * 1e9:8.0f} ns/row ({len(rows)} rows)")
+        best = min(timeit.repeat(lambda: [ineligibility_reasons(row) for row in rows], number=3, repeat=3)) / 3
+        self.stdout.write(f"{'compiled':<12} {'row by row':<20} {best / len(rows) * 1e9:8.0f} ns/row ({len(rows)} rows)")
@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, seed_benchmark_data, summarize
+
+ENDPOINTS = {
+    'home': lambda: reverse('home'),
+    'search_donors': lambda: reverse('search_donors') + '?blood_group=O%2B&district=Kozhikode',
+    'blood_requests_list': lambda: reverse('blood_requests_list'),
+    'live_stock': lambda: reverse('live_stock'),
+    'hospital_profile': lambda: reverse('hospital_profile'),
+}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a reproducible dataset into a throwaway database and drives the '
+        'main endpoints with concurrent workers, reporting p50/p95/p99 latency '
+        'and requests/sec. Results can be saved as JSON and compared with a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', nargs='+', default=list(ENDPOINTS), choices=list(ENDPOINTS))
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent clients per endpoint.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint (split across workers).')
+        parser.add_argument('--server', action='store_true', help='Go through a local threaded WSGI server over HTTP instead of the in-process test client.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--donors', type=int, default=2000)
+        parser.add_argument('--hospitals', type=int, default=50)
+        parser.add_argument('--blood-requests', type=int, default=500)
+        parser.add_argument('--output', help='Write results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with a JSON file written by an earlier --output run.')
+        parser.add_argument('--max-regression', type=float, default=None, help='Exit with an error if any p95 is this many %% worse than the baseline.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline: {e}")
+
+        # Production-like: no DEBUG query log or debug templates
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver', '127.0.0.1']), benchmark_database():
+            hospitals = seed_benchmark_data(
+                seed=options['seed'], donors=options['donors'],
+                hospitals=options['hospitals'], blood_requests=options['blood_requests'],
+            )
+            session_key = self._hospital_session(hospitals[0]) if hospitals else None
+            # Worker threads open their own connections
+            connection.close()
+
+            server = self._start_server() if options['server'] else None
+            try:
+                results = {
+                    name: self._run(ENDPOINTS[name](), session_key, server, options)
+                    for name in options['endpoints']
+                }
+            finally:
+                if server:
+                    server.shutdown()
+                    server.server_close()
+
+        report = {
+            'meta': {
+                'seed': options['seed'], 'workers': options['workers'], 'requests': options['requests'],
+                'mode': 'server' if options['server'] else 'client', 'donors': options['donors'],
+                'hospitals': options['hospitals'], 'blood_requests': options['blood_requests'],
+                'timestamp': int(time.time()),
+            },
+            'endpoints': results,
+        }
+        regressions = self._print(report, baseline, options['max_regression'])
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+        if regressions:
+            raise CommandError(f"p95 regressed beyond {options['max_regression']}% for: {', '.join(regressions)}")
+
+    def _hospital_session(self, hospital):
+        """A logged-in hospital session, created directly instead of through the login form."""
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store['hospital_email'] = hospital.email
+        store.save()
+        return store.session_key
+
+    def _start_server(self):
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=True)
+        server.set_app(get_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _run(self, path, session_key, server, options):
+        workers = max(1, options['workers'])
+        per_worker = max(1, options['requests'] // workers)
+        samples, errors = [], []
+        lock = threading.Lock()
+
+        def worker():
+            own, failed = [], 0
+            if server:
+                url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+                request = urllib.request.Request(url, headers={'Cookie': f"{settings.SESSION_COOKIE_NAME}={session_key}"})
+
+                def get():
+                    try:
+                        with urllib.request.urlopen(request) as response:
+                            response.read()
+                            return response.status
+                    except urllib.error.HTTPError as e:
+                        return e.code
+            else:
+                # Errors are counted, not raised
+                client = Client(raise_request_exception=False)
+                if session_key:
+                    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+
+                def get():
+                    return client.get(path).status_code
+
+            for _ in range(per_worker):
+                start = time.perf_counter()
+                status = get()
+                own.append(time.perf_counter() - start)
+                if status >= 400:
+                    failed += 1
+            connection.close()
+            with lock:
+                samples.extend(own)
+                errors.append(failed)
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        stats = summarize(samples)
+        return {
+            'path': path,
+            'requests': stats['n'],
+            'errors': sum(errors),
+            'rps': stats['n'] / wall if wall else 0.0,
+            'mean_ms': stats['mean_ms'],
+            'p50_ms': stats['p50_ms'],
+            'p95_ms': stats['p95_ms'],
+            'p99_ms': stats['p99_ms'],
+        }
+
+    def _print(self, report, baseline, max_regression):
+        regressions = []
+        base = (baseline or {}).get('endpoints', {})
+        self.stdout.write(f"{'endpoint':<22}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}  vs baseline p95")
+        for name, r in report['endpoints'].items():
+            line = f"{name:<22}{r['rps']:9.1f}{r['p50_ms']:10.2f}{r['p95_ms']:10.2f}{r['p99_ms']:10.2f}{r['errors']:8d}"
+            if name in base and base[name]['p95_ms']:
+                change = (r['p95_ms'] - base[name]['p95_ms']) / base[name]['p95_ms'] * 100
+                line += f"  {change:+.1f}%"
+                if max_regression is not None and change > max_regression:
+                    regressions.append(name)
+            self.stdout.write(line)
+        return regressions
@@ -0,0 +1,65 @@
+import hashlib
+import math
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, format_stats, time_calls
+from core.credentials import TunedPBKDF2PasswordHasher
+from core.models import Donor
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures donor login throughput for one worker and how many workers '
+        'a peak login rate needs at the configured PASSWORD_HASH_ITERATIONS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Logins timed per measurement.')
+        parser.add_argument('--peak-per-minute', type=int, default=300, help='Expected peak logins per minute at a camp.')
+        parser.add_argument(
+            '--work-factors', type=int, nargs='*', default=[],
+            help='Extra PBKDF2 iteration counts to compare against the configured one.',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        configured = TunedPBKDF2PasswordHasher.iterations
+
+        self.stdout.write("Hash verification only:")
+        for work_factor in [configured, *options['work_factors']]:
+            hasher = type('BenchHasher', (TunedPBKDF2PasswordHasher,), {'iterations': work_factor})()
+            encoded = hasher.encode('bench-password', hasher.salt())
+            stats = time_calls(lambda: hasher.verify('bench-password', encoded), iterations, warmup=2)
+            self.stdout.write(format_stats(f"pbkdf2 {work_factor}", stats))
+
+        with benchmark_database():
+            donor = Donor(name='Bench Donor', email='bench@example.com', phone='9999999999', blood_group='O+', is_verified=True)
+            donor.set_password('bench-password')
+            donor.save()
+            url = reverse('donor_login')
+            form = {'email': donor.email, 'password': 'bench-password'}
+
+            def login():
+                Client().post(url, form)
+
+            self.stdout.write("Full donor_login request:")
+            stats = time_calls(login, iterations, warmup=2)
+            self.stdout.write(format_stats(f"donor_login {configured}", stats))
+
+            # The first login of a legacy account also pays for the re-hash
+            def legacy_login():
+                Donor.objects.filter(pk=donor.pk).update(password=hashlib.sha256(b'bench-password').hexdigest())
+                login()
+
+            legacy = time_calls(legacy_login, iterations)
+            self.stdout.write(format_stats("donor_login legacy upgrade", legacy))
+
+        peak_per_sec = options['peak_per_minute'] / 60
+        workers = math.ceil(peak_per_sec / stats['per_sec']) if stats['per_sec'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"One worker sustains ~{stats['per_sec']:.1f} logins/s; "
+            f"{options['peak_per_minute']} logins/min needs at least {workers} worker(s) busy only with logins."
+        ))
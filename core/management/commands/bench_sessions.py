@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.credentials import hash_password
+from core.benchmarks import benchmark_database, format_stats, time_calls
+from core.models import Donation, Donor
+
+
+class Command(BaseCommand):
+    help = 'Compares per-request latency of home and donor_profile for each SESSION_MODE.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=300)
+        parser.add_argument('--modes', nargs='+', default=list(settings.SESSION_ENGINES), choices=list(settings.SESSION_ENGINES))
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            donor = Donor.objects.create(
+                name='Bench Donor', email='bench@example.com', phone='9999999999',
+                blood_group='O+', state='Kerala', district='Kozhikode',
+                password=hash_password('bench-password'), is_verified=True,
+            )
+            Donation.objects.bulk_create(Donation(donor=donor, location='Kozhikode') for _ in range(5))
+
+            for mode in options['modes']:
+                with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                    # A fresh client picks up the overridden SessionMiddleware
+                    client = Client()
+                    client.post(reverse('donor_login'), {'email': donor.email, 'password': 'bench-password'})
+                    for name in ('home', 'donor_profile'):
+                        url = reverse(name)
+                        stats = time_calls(lambda: client.get(url), options['iterations'], warmup=10)
+                        self.stdout.write(format_stats(f"{mode} {name}", stats))
@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.benchmarks import benchmark_database, summarize
+from core.models import BloodStock, Feedback, Hospital
+from core.utils import BLOOD_TYPES
+
+PROFILES = {
+    'stock': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}},
+    'tuned': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': settings.SQLITE_TUNED_OPTIONS},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Concurrent read/write load test against a throwaway SQLite file, '
+        'comparing the stock connection settings with the tuned profile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("The default database is not SQLite; nothing to compare.")
+            return
+
+        db_settings = connections.settings['default']
+        original = {key: db_settings.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')}
+        try:
+            for profile in options['profiles']:
+                # Threads open their own connections from these settings
+                db_settings.update(PROFILES[profile])
+                with benchmark_database():
+                    self._seed()
+                    self._run(profile, options)
+        finally:
+            db_settings.update(original)
+
+    def _seed(self):
+        expiry = timezone.localdate() + timedelta(days=30)
+        for i in range(20):
+            hospital = Hospital.objects.create(name=f"Bench Hospital {i}", email=f"bench{i}@example.com", phone='0', location='Kozhikode')
+            BloodStock.objects.bulk_create(
+                BloodStock(hospital=hospital, blood_type=bt, units=10, expiry_date=expiry) for bt in BLOOD_TYPES
+            )
+        # Threads must not share the seeding connection
+        connection.close()
+
+    def _run(self, profile, options):
+        deadline = time.perf_counter() + options['seconds']
+        results = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        lock = threading.Lock()
+        stock_ids = list(BloodStock.objects.values_list('id', flat=True))
+        connection.close()
+
+        def read():
+            list(BloodStock.objects.filter(units__gt=0).select_related('hospital').order_by('blood_type')[:50])
+            Hospital.objects.count()
+
+        def write():
+            with transaction.atomic():
+                BloodStock.objects.filter(id=random.choice(stock_ids)).update(units=F('units') + 1)
+                Feedback.objects.create(name='Bench', email='bench@example.com', message='load test')
+
+        def worker(kind, op):
+            samples, failed = [], 0
+            while time.perf_counter() < deadline:
+                # Same connection handling as a request/response cycle
+                close_old_connections()
+                start = time.perf_counter()
+                try:
+                    op()
+                    samples.append(time.perf_counter() - start)
+                except OperationalError:
+                    failed += 1
+                finally:
+                    close_old_connections()
+            connection.close()
+            with lock:
+                results[kind].extend(samples)
+                errors[kind] += failed
+
+        threads = [threading.Thread(target=worker, args=('read', read)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write', write)) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for kind in ('read', 'write'):
+            stats = summarize(results[kind])
+            self.stdout.write(
+                f"{profile:<6} {kind:<5} {stats['n'] / options['seconds']:9.1f} ops/s "
+                f"p50={stats['p50_ms']:7.2f}ms p99={stats['p99_ms']:8.2f}ms errors={errors[kind]}"
+            )
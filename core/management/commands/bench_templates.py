@@ -0,0 +1,240 @@
+import functools
+import time
+from collections import Counter, defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, engines
+from django.template.base import Node, TextNode, VariableNode
+from django.test import Client, override_settings
+from django.test.signals import template_rendered
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, seed_benchmark_data, summarize
+from core.instrumentation import QueryRecorder
+from core.models import BloodRequest, Donor
+from core.templating import project_template_names
+
+# Pages requested once to capture real contexts: (URL name, args, logged in as)
+PAGES = [
+    ('home', (), None),
+    ('search_donors', (), None),
+    ('request_blood', (), None),
+    ('blood_requests_list', (), None),
+    ('hospital_list', (), None),
+    ('live_stock', (), None),
+    ('donor_register', (), None),
+    ('donor_login', (), None),
+    ('hospital_register', (), None),
+    ('hospital_login', (), None),
+    ('feedback', (), None),
+    ('detailed_health_check', (), None),
+    ('hospital_public_profile', ('hospital',), None),
+    ('donor_request', ('hospital',), None),
+    ('hospital_dashboard', (), 'hospital'),
+    ('hospital_profile', (), 'hospital'),
+    ('edit_hospital_profile', (), 'hospital'),
+    ('manage_blood_stock', (), 'hospital'),
+    ('add_blood_request', (), 'hospital'),
+    ('analytics_dashboard', (), 'hospital'),
+    ('donor_profile', (), 'donor'),
+    ('edit_donor_profile', (), 'donor'),
+]
+SEARCH_QUERY = '?blood_group=O%2B&district=Kozhikode'
+
+
+class RenderTimer:
+    """
+    Exclusive (self) time per tag and per filter: each tag's time excludes
+    the nested tags and filters it renders, so the totals don't double count.
+    """
+
+    def __init__(self):
+        self.time = defaultdict(float)
+        self.calls = Counter()
+        self._stack = []
+        self._patched = []
+
+    def _record(self, key, elapsed, own_children):
+        self.time[key] += elapsed - own_children
+        self.calls[key] += 1
+        if self._stack:
+            self._stack[-1] += elapsed
+
+    def install(self, engine):
+        timer = self
+        original = Node.render_annotated
+
+        def render_annotated(node, context):
+            timer._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(node, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                timer._record(_node_label(node), elapsed, timer._stack.pop())
+
+        Node.render_annotated = render_annotated
+        self._patched.append((Node, 'render_annotated', original))
+
+        # Filters are bound when a template compiles, so wrap them before compiling
+        for library in [*engine.template_builtins, *engine.template_libraries.values()]:
+            for name, func in list(library.filters.items()):
+                library.filters[name] = self._timed_filter(name, func)
+                self._patched.append((library.filters, name, func))
+
+    def _timed_filter(self, name, func):
+        timer = self
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer._record(f"|{name}", time.perf_counter() - start, 0.0)
+
+        return timed
+
+    def uninstall(self):
+        for target, name, original in reversed(self._patched):
+            if isinstance(target, dict):
+                target[name] = original
+            else:
+                setattr(target, name, original)
+        self._patched.clear()
+
+
+def _node_label(node):
+    if isinstance(node, TextNode):
+        return '(text)'
+    if isinstance(node, VariableNode):
+        return '{{ variable }}'
+    token = getattr(node, 'token', None)
+    return f"{{% {token.contents.split()[0]} %}}" if token else type(node).__name__
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders every project template with contexts captured from real page '
+        'views (on a throwaway seeded database) and reports compile time, render '
+        'latency, queries issued while rendering, and the slowest tags and filters.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help='Renders per template (default: 100).')
+        parser.add_argument('--templates', nargs='+', help='Only these template names.')
+        parser.add_argument('--top', type=int, default=15, help='Tags/filters to list (default: 15).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        names = options['templates'] or project_template_names()
+
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), benchmark_database():
+            hospitals = seed_benchmark_data(seed=options['seed'], donors=500, hospitals=20)
+            contexts = self.capture_contexts(hospitals[0], Donor.objects.first())
+
+            # A plain (uncached) engine with the project's settings, to time parsing
+            configured = engines['django'].engine
+            engine = Engine(
+                dirs=configured.dirs, loaders=settings.TEMPLATE_LOADERS,
+                context_processors=configured.context_processors, builtins=[],
+                libraries=configured.libraries, debug=False,
+            )
+            rows = [self.bench_template(engine, name, contexts, options['iterations']) for name in names]
+
+            timer = RenderTimer()
+            timer.install(engine)
+            try:
+                for name in names:
+                    # Compiled again so the wrapped filters are the ones bound
+                    template = engine.get_template(name)
+                    context = contexts.get(name, {})
+                    for _ in range(options['iterations']):
+                        template.render(Context(context))
+            finally:
+                timer.uninstall()
+
+        self.print_report(rows, timer, options['top'])
+
+    def capture_contexts(self, hospital, donor):
+        """{template name: flattened context} from one GET of each page, plus an urgent-request email."""
+        contexts = {}
+
+        def capture(sender, template, context, **kwargs):
+            contexts.setdefault(template.name, context.flatten())
+
+        clients = {None: Client(), 'hospital': Client(), 'donor': Client()}
+        for role, key, obj in (('hospital', 'hospital_email', hospital), ('donor', 'donor_email', donor)):
+            store = import_module(settings.SESSION_ENGINE).SessionStore()
+            store[key] = obj.email
+            store.save()
+            clients[role].cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+
+        template_rendered.connect(capture)
+        try:
+            for url_name, args, role in PAGES:
+                url = reverse(url_name, args=[hospital.pk for _ in args])
+                if url_name == 'search_donors':
+                    url += SEARCH_QUERY
+                clients[role].get(url)
+            BloodRequest.objects.create(
+                patient_name='Bench', hospital_name=hospital.name, blood_group_needed='O-', location='',
+                contact_number='9000000000', age=30, gender='Female', state='Kerala', district='Kozhikode',
+                urgent=True,
+            )
+        finally:
+            template_rendered.disconnect(capture)
+        return contexts
+
+    def bench_template(self, engine, name, contexts, iterations):
+        compile_runs = max(1, iterations // 10)
+        start = time.perf_counter()
+        for _ in range(compile_runs):
+            template = engine.get_template(name)
+        compile_ms = (time.perf_counter() - start) / compile_runs * 1000
+
+        context = contexts.get(name)
+        samples = []
+        with QueryRecorder() as queries:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                template.render(Context(context or {}))
+                samples.append(time.perf_counter() - start)
+        return {
+            'name': name,
+            'captured': context is not None,
+            'compile_ms': compile_ms,
+            'stats': summarize(samples),
+            'queries': queries.count / iterations,
+        }
+
+    def print_report(self, rows, timer, top):
+        self.stdout.write(
+            f"{'template':<30}{'compile ms':>11}{'render ms':>11}{'p95 ms':>9}{'queries':>9}"
+        )
+        for row in sorted(rows, key=lambda r: r['stats']['mean_ms'], reverse=True):
+            note = '' if row['captured'] else '  (no page renders it; empty context)'
+            self.stdout.write(
+                f"{row['name']:<30}{row['compile_ms']:11.3f}{row['stats']['mean_ms']:11.3f}"
+                f"{row['stats']['p95_ms']:9.3f}{row['queries']:9.1f}{note}"
+            )
+        total_compile = sum(row['compile_ms'] for row in rows)
+        self.stdout.write(
+            f"\nParsing all {len(rows)} templates takes {total_compile:.1f}ms: once per process with "
+            f"the cached loader (at startup with TEMPLATE_WARMUP), on every render without it."
+        )
+
+        for title, prefix in (('tags', ''), ('filters', '|')):
+            keys = [k for k in timer.time if k.startswith('|') == (prefix == '|')]
+            keys.sort(key=lambda k: timer.time[k], reverse=True)
+            self.stdout.write(f"\nSlowest {title} (self time, all templates)")
+            self.stdout.write(f"{'':<28}{'calls':>9}{'total ms':>11}{'per call us':>13}")
+            for key in keys[:top]:
+                total = timer.time[key]
+                self.stdout.write(
+                    f"{key:<28}{timer.calls[key]:9d}{total * 1000:11.2f}{total / timer.calls[key] * 1e6:13.2f}"
+                )
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.images import PROFILE_PIC_DIR, PROFILE_PIC_VARIANTS, variant_name
+from core.models import Donor
+
+
+def walk(storage, path):
+    """Yields every file name below path in the storage."""
+    try:
+        dirs, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield f'{path}/{name}'
+    for sub in dirs:
+        yield from walk(storage, f'{path}/{sub}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes profile pictures and variants that no donor references any more. '
+        'Files newer than PROFILE_PIC_CLEANUP_GRACE_SECONDS are kept, as their donor may not be saved yet.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List orphaned files without deleting them.')
+
+    def handle(self, *args, **options):
+        keep = set()
+        names = Donor.objects.exclude(profile_pic='').exclude(profile_pic__isnull=True).values_list('profile_pic', flat=True)
+        for name in names.iterator(chunk_size=2000):
+            keep.add(name)
+            keep.update(variant_name(name, variant) for variant in PROFILE_PIC_VARIANTS)
+
+        cutoff = timezone.now() - timedelta(seconds=settings.PROFILE_PIC_CLEANUP_GRACE_SECONDS)
+        orphans = [
+            name for name in walk(default_storage, PROFILE_PIC_DIR)
+            if name not in keep and default_storage.get_modified_time(name) < cutoff
+        ]
+        for name in orphans:
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+
+        verb = "Found" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(orphans)} orphaned file(s)."))
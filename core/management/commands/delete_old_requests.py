@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from core.models import BloodRequest
@@ -9,6 +10,8 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         expired_time = timezone.now() - timedelta(hours=24)
         old_requests = BloodRequest.objects.filter(created_at__lt=expired_time)
-        count = old_requests.count()
-        old_requests.delete()
+        # Each delete is logged to the change feed (core.signals); keep the
+        # rows and their log entries in one transaction
+        with transaction.atomic():
+            count, _ = old_requests.delete()
         self.stdout.write(self.style.SUCCESS(f"Deleted {count} expired blood requests."))
@@ -0,0 +1,50 @@
+import argparse
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.exports import EXPORTS, FORMATS, export_filename, stream_export
+
+
+def _date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports a table as CSV or JSON Lines, streamed in chunks so memory stays '
+        'flat however many rows there are.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=list(EXPORTS))
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output.')
+        parser.add_argument('--from', dest='start', type=_date, help='First date to include (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='end', type=_date, help='Last date to include (YYYY-MM-DD).')
+        parser.add_argument('--output', help="File to write (default: <name>-<date>.<format>[.gz]; '-' for stdout).")
+
+    def handle(self, *args, **options):
+        name, fmt, compress = options['name'], options['format'], options['gzip']
+        chunks = stream_export(name, fmt, compress, options['start'], options['end'])
+        output = options['output'] or export_filename(name, fmt, compress)
+
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        try:
+            with open(output, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+        except OSError as e:
+            raise CommandError(f"Could not write {output}: {e}")
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written:,} bytes to {output}"))
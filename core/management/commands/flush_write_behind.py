@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.writebehind import BUFFERS
+
+
+class Command(BaseCommand):
+    help = (
+        'Inserts rows from write-behind spool files left by processes that are no '
+        'longer running (e.g. after a crash). Safe to run while the site is up.'
+    )
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, buffer in BUFFERS.items():
+            recovered = buffer.recover()
+            total += recovered
+            self.stdout.write(f"{label}: {recovered} row(s)")
+        self.stdout.write(self.style.SUCCESS(f"Recovered {total} row(s)."))
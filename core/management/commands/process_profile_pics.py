@@ -0,0 +1,50 @@
+import os
+import re
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.images import generate_variants, store_profile_pic
+from core.models import Donor
+
+CONTENT_ADDRESSED_RE = re.compile(r'^profile_pics/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders missing profile picture variants (backfill for anything the '
+        'background worker missed). With --rehash, also moves legacy uploads to '
+        'content-addressed names so duplicate images are stored once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rehash', action='store_true', help='Re-store legacy uploads under their content hash.')
+
+    def handle(self, *args, **options):
+        rehashed = made = failed = 0
+        donors = Donor.objects.exclude(profile_pic='').exclude(profile_pic__isnull=True)
+        for donor_id, name in donors.values_list('id', 'profile_pic').iterator(chunk_size=500):
+            if not default_storage.exists(name):
+                self.stderr.write(f"Missing file for donor {donor_id}: {name}")
+                failed += 1
+                continue
+
+            if options['rehash'] and not CONTENT_ADDRESSED_RE.match(name):
+                with default_storage.open(name, 'rb') as f:
+                    f.name = os.path.basename(name)
+                    new_name = store_profile_pic(f)
+                # update() so the identity cache signal doesn't fire per row;
+                # the old file is left for cleanup_profile_pics
+                Donor.objects.filter(id=donor_id).update(profile_pic=new_name)
+                name = new_name
+                rehashed += 1
+
+            try:
+                made += generate_variants(name)
+            except Exception as e:
+                self.stderr.write(f"Could not create variants for {name}: {e}")
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {made} variant(s), re-stored {rehashed} upload(s), {failed} failure(s)."
+        ))
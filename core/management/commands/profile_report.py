@@ -0,0 +1,85 @@
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import load_stats, profile_dir, saved_profiles
+
+SORT_KEYS = {'tottime': 2, 'cumtime': 3, 'calls': 1}
+
+
+def describe(func):
+    filename, line, name = func
+    if filename == '~':  # C builtins
+        return name
+    # Last two path parts are enough to tell django/db/... from core/...
+    return f"{'/'.join(Path(filename).parts[-2:])}:{line}({name})"
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarizes the request profiles captured by ProfilingMiddleware: '
+        'time split per view and the hottest functions across all captures.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help='Only captures of this URL name (e.g. hospital_list).')
+        parser.add_argument('--limit', type=int, default=25, help='Functions to show (default: 25).')
+        parser.add_argument('--sort', choices=list(SORT_KEYS), default='tottime')
+        parser.add_argument('--list', action='store_true', help='List the captures and stop.')
+        parser.add_argument('--clear', action='store_true', help='Delete the (matching) captures.')
+
+    def handle(self, *args, **options):
+        profiles = saved_profiles(options['view'])
+        if not profiles:
+            self.stdout.write(f"No profiles in {profile_dir()}.")
+            return
+
+        if options['clear']:
+            for profile_id, _ in profiles:
+                for suffix in ('.prof', '.json'):
+                    (profile_dir() / f"{profile_id}{suffix}").unlink(missing_ok=True)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {len(profiles)} profile(s)."))
+            return
+
+        if options['list']:
+            for profile_id, summary in profiles:
+                self.stdout.write(
+                    f"{profile_id:<50} {summary['status']:>3} {summary['total_ms']:>9.1f}ms  "
+                    f"sql {summary['sql_ms']:>7.1f}ms ({summary['sql_count']})  tpl {summary['template_ms']:>7.1f}ms"
+                )
+            return
+
+        if options['limit'] < 1:
+            raise CommandError("--limit must be at least 1.")
+
+        self.write_split(profiles)
+        self.write_hottest(load_stats([profile_id for profile_id, _ in profiles]), options)
+
+    def write_split(self, profiles):
+        by_view = defaultdict(list)
+        for _, summary in profiles:
+            by_view[summary['view'] or '(unresolved)'].append(summary)
+
+        self.stdout.write(f"{'view':<30} {'n':>4} {'avg ms':>9} {'sql ms':>9} {'tpl ms':>9} {'other ms':>9}")
+        rows = []
+        for view, summaries in by_view.items():
+            n = len(summaries)
+            total, sql, tpl = (sum(s[key] for s in summaries) / n for key in ('total_ms', 'sql_ms', 'template_ms'))
+            # SQL issued from inside templates (lazy querysets) is counted in both
+            rows.append((total, view, n, sql, tpl, max(total - sql - tpl, 0)))
+        for total, view, n, sql, tpl, other in sorted(rows, reverse=True):
+            self.stdout.write(f"{view:<30} {n:>4} {total:>9.1f} {sql:>9.1f} {tpl:>9.1f} {other:>9.1f}")
+        self.stdout.write("")
+
+    def write_hottest(self, stats, options):
+        total = stats.total_tt or 1
+        index = SORT_KEYS[options['sort']]
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)
+
+        self.stdout.write(f"Hottest functions by {options['sort']} ({len(stats.files)} profile(s), {total:.3f}s profiled)")
+        self.stdout.write(f"{'calls':>10} {'tottime':>9} {'%':>6} {'cumtime':>9}  function")
+        for func, (_, calls, tottime, cumtime, _) in rows[:options['limit']]:
+            self.stdout.write(
+                f"{calls:>10} {tottime:>9.4f} {tottime / total:>6.1%} {cumtime:>9.4f}  {describe(func)}"
+            )
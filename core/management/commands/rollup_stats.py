@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.rollups import rebuild_donations, run_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Updates the daily donation/request rollups behind the analytics dashboard, '
+        'adding in the rows created since the last run. '
+        'Run it from cron, e.g. every 10 minutes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-donations', action='store_true',
+            help=(
+                'Count all donations again from scratch. Request counters are always kept: '
+                'delete_old_requests purges requests after 24 hours, so the rollups are their only record.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            if options['rebuild_donations']:
+                rebuild_donations()
+            start, written = run_rollup()
+        elapsed = time.perf_counter() - started
+        if start is None:
+            self.stdout.write("Nothing new to roll up.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up new rows from {start} on: {written} rollup rows in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,115 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.eligibility import FLAG_FIELDS, NUMERIC_FIELDS, screen_columns
+from core.models import Donor, DonorHealthCheck
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+# age is a PositiveIntegerField
+MAX_AGE = 2 ** 31 - 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Screens a CSV of health checks from a donation camp in one vectorized '
+        'pass and saves them as DonorHealthCheck rows. Columns: age, weight, '
+        'hemoglobin_level, the yes/no questions (recent_illness, medication, ...) '
+        'and an optional donor_email.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--output', help='Write per-row verdicts and reasons to this CSV file.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk_create.')
+        parser.add_argument('--dry-run', action='store_true', help='Report verdicts without saving anything.')
+
+    def handle(self, *args, **options):
+        try:
+            import numpy as np
+        except ImportError:
+            raise CommandError('Batch screening needs NumPy (pip install numpy).')
+
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(f"Could not read {options['csv_file']}: {e}")
+        if not rows:
+            self.stdout.write("No rows to screen.")
+            return
+
+        missing_columns = [field for field in NUMERIC_FIELDS if field not in rows[0]]
+        if missing_columns:
+            raise CommandError(f"Missing column(s): {', '.join(missing_columns)}")
+
+        columns = {
+            field: np.array([_to_float(row.get(field)) for row in rows], dtype=float)
+            for field in NUMERIC_FIELDS
+        }
+        for field in FLAG_FIELDS:
+            columns[field] = np.array(
+                [(row.get(field) or '').strip().lower() in TRUE_VALUES for row in rows], dtype=bool,
+            )
+        eligible, reasons = screen_columns(columns)
+
+        # Rows with a blank, non-numeric, infinite or negative measurement
+        # (or an age too big for the column) can't be stored
+        problems = []  # (bool mask of affected rows, reason)
+        for field in NUMERIC_FIELDS:
+            values = columns[field]
+            problems += [
+                (np.isnan(values), f"Missing {field}."),
+                (np.isinf(values), f"{field} is not a finite number."),
+                (values < 0, f"{field} can't be negative."),
+            ]
+        problems.append((np.isfinite(columns['age']) & (columns['age'] > MAX_AGE), "age is out of range."))
+        invalid = np.zeros(len(rows), dtype=bool)
+        for mask, _ in problems:
+            invalid |= mask
+
+        emails = {(row.get('donor_email') or '').strip() for row in rows} - {''}
+        donor_ids = dict(Donor.objects.filter(email__in=emails).values_list('email', 'id'))
+
+        checks, verdicts = [], []
+        for i, row in enumerate(rows):
+            if invalid[i]:
+                verdicts.append((i + 2, 'invalid', [reason for mask, reason in problems if mask[i]]))
+                continue
+            verdicts.append((i + 2, 'eligible' if eligible[i] else 'not eligible', reasons[i]))
+            checks.append(DonorHealthCheck(
+                donor_id=donor_ids.get((row.get('donor_email') or '').strip()),
+                age=int(columns['age'][i]),
+                weight=float(columns['weight'][i]),
+                hemoglobin_level=float(columns['hemoglobin_level'][i]),
+                eligible=bool(eligible[i]),
+                **{field: bool(columns[field][i]) for field in FLAG_FIELDS},
+            ))
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'verdict', 'reasons'])
+                for line, verdict, row_reasons in verdicts:
+                    writer.writerow([line, verdict, ' '.join(row_reasons)])
+        else:
+            for line, verdict, row_reasons in verdicts:
+                self.stdout.write(f"line {line}: {verdict}" + (f" - {' '.join(row_reasons)}" if row_reasons else ''))
+
+        if not options['dry_run'] and checks:
+            with transaction.atomic():
+                DonorHealthCheck.objects.bulk_create(checks, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Screened {len(rows)} row(s): {int(eligible[~invalid].sum())} eligible, "
+            f"{int((~eligible & ~invalid).sum())} not eligible, {int(invalid.sum())} invalid"
+            + ("." if options['dry_run'] else f"; saved {len(checks)} health check(s).")
+        ))
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.models import Donor
+
+
+class Command(BaseCommand):
+    help = (
+        'Emails donors whose 90-day cooldown ends on the given date. '
+        'Meant to run once a day from cron; re-running for the same date '
+        'skips donors who were already reminded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Eligibility date to remind for (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--days', type=int, default=1, help='Number of eligibility days to cover, starting at --date.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Donors rendered and sent per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Count matching donors without sending anything.')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                start = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format.')
+        else:
+            start = timezone.localdate()
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days and --batch-size must be positive.')
+
+        # next_eligible_date() is last_donation_date + cooldown, so the
+        # eligibility window maps onto a range over the indexed column.
+        cooldown = timedelta(days=Donor.DONATION_COOLDOWN_DAYS)
+        donors = Donor.objects.filter(
+            last_donation_date__gte=start - cooldown,
+            last_donation_date__lt=start - cooldown + timedelta(days=options['days']),
+            is_verified=True,
+        ).exclude(email='')
+        # Reminders already sent for this window carry an eligibility date
+        # inside it; older reminders belong to an earlier cooldown.
+        donors = donors.exclude(eligibility_reminder_date__gte=start)
+
+        if options['dry_run']:
+            self.stdout.write(f"{donors.count()} donor(s) would be reminded.")
+            return
+
+        sent = 0
+        connection = get_connection()
+        connection.open()
+        try:
+            for batch in self._batches(donors, options['batch_size']):
+                messages = []
+                for donor_id, name, email, blood_group, last_donation_date in batch:
+                    eligible_date = last_donation_date + cooldown
+                    html_content = render_to_string('eligibility_reminder.html', {
+                        'name': name,
+                        'blood_group': blood_group,
+                        'last_donation_date': last_donation_date,
+                        'eligible_date': eligible_date,
+                    })
+                    message = EmailMessage(
+                        "You're eligible to donate blood again",
+                        html_content,
+                        settings.EMAIL_HOST_USER,
+                        [email],
+                        connection=connection,
+                    )
+                    message.content_subtype = 'html'
+                    messages.append(message)
+
+                connection.send_messages(messages)
+                # Mark each batch as soon as it is sent, so a re-run on the
+                # same day (or after a crash mid-run) never double-sends.
+                for last_donation_date in {row[4] for row in batch}:
+                    Donor.objects.filter(
+                        id__in=[row[0] for row in batch if row[4] == last_donation_date],
+                    ).update(eligibility_reminder_date=last_donation_date + cooldown)
+                sent += len(messages)
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} eligibility reminder(s)."))
+
+    def _batches(self, donors, batch_size):
+        """Yield value tuples in primary-key order, one bounded batch at a time."""
+        last_id = 0
+        while True:
+            batch = list(
+                donors.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'name', 'email', 'blood_group', 'last_donation_date')[:batch_size]
+            )
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1][0]
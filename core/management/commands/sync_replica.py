@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        'Copies the primary SQLite database into the replica file with the '
+        'SQLite online backup API. Readers of the replica see either the old '
+        'or the new snapshot, never a half-written one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Keep syncing every N seconds instead of once.')
+        parser.add_argument('--pages', type=int, default=1024, help='Pages copied per backup step; the primary is only locked per step.')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured; set DATABASE_REPLICA to a SQLite file path.')
+        primary = settings.DATABASES['default']
+        replica = settings.DATABASES[REPLICA_ALIAS]
+        if 'sqlite3' not in primary['ENGINE'] or 'sqlite3' not in replica['ENGINE']:
+            raise CommandError('sync_replica only handles SQLite primaries and replicas.')
+
+        while True:
+            start = time.perf_counter()
+            self._sync(str(primary['NAME']), str(replica['NAME']), options['pages'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Replica synced in {(time.perf_counter() - start) * 1000:.0f} ms."
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _sync(self, primary_path, replica_path, pages):
+        # Django's own replica connection may hold a read snapshot open
+        connections[REPLICA_ALIAS].close()
+        source = sqlite3.connect(primary_path)
+        target = sqlite3.connect(replica_path, timeout=30)
+        try:
+            source.backup(target, pages=pages)
+        finally:
+            target.close()
+            source.close()
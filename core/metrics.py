@@ -0,0 +1,251 @@
+# core/metrics.py
+# Prometheus-style counters and histograms shared by all worker processes.
+#
+# Every process writes its values into its own memory-mapped file in
+# settings.METRICS_DIR (<pid>.values, plus <pid>.keys naming each slot), so
+# recording is an in-memory float add with no syscalls or IPC. /metrics reads
+# and sums every file in the directory, deleting those of processes that
+# have exited, so a restart shows up as a counter reset rather than old
+# workers' totals piling up.
+
+import json
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+from .utils import pid_alive
+
+# 8192 slots of 8 bytes: a 64KB file per process
+CAPACITY = 8192
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = {}
+# Only guards slot allocation. Updates go without it: under the GIL a single
+# `values[i] += n` on a memoryview runs no Python code and has no eval-breaker
+# check in the middle, so threads can't interleave inside it, and taking a
+# lock there would cost more than the update itself.
+_lock = threading.Lock()
+_store = None
+
+
+class _Store:
+    """This process's slot file (or a plain array when METRICS_DIR is unset)."""
+
+    def __init__(self):
+        self.next_slot = 0
+        directory = settings.METRICS_DIR
+        if not directory:
+            self.values, self.keys = memoryview(array('d', bytes(CAPACITY * 8))), None
+            return
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        with open(directory / f"{pid}.values", 'w+b') as f:
+            f.truncate(CAPACITY * 8)
+            self._mmap = mmap.mmap(f.fileno(), CAPACITY * 8)
+        self.values = memoryview(self._mmap).cast('d')
+        self.keys = open(directory / f"{pid}.keys", 'w', buffering=1)
+
+    def allocate(self, name, labels, size):
+        if self.next_slot + size > CAPACITY:
+            return None
+        slot = self.next_slot
+        self.next_slot += size
+        if self.keys is not None:
+            # Written before the slot is used, so a reader never sees values
+            # it can't name
+            self.keys.write(json.dumps([name, list(labels), size]) + "\n")
+        return slot
+
+
+def _reset_after_fork():
+    # A forked worker must not keep writing into its parent's file
+    global _store
+    _store = None
+    for metric in REGISTRY.values():
+        metric._slots.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._slots = {}  # label values -> first slot
+        REGISTRY[name] = self
+
+    def _allocate(self, labels):
+        global _store
+        with _lock:
+            if labels in self._slots:
+                return self._slots[labels]
+            if _store is None:
+                _store = _Store()
+            slot = _store.allocate(self.name, labels, self.size)
+            if slot is None:
+                return None
+            self._slots[labels] = slot
+            return slot
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    size = 1
+
+    def inc(self, *labels, amount=1):
+        slot = self._slots.get(labels)
+        if slot is None and (slot := self._allocate(labels)) is None:
+            return  # out of slots; dropping beats crashing the request
+        _store.values[slot] += amount
+
+
+class Histogram(_Metric):
+    """Stores the sum, then one count per bucket (not cumulative); +Inf is the last bucket."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.size = len(self.buckets) + 2
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, *labels):
+        slot = self._slots.get(labels)
+        if slot is None and (slot := self._allocate(labels)) is None:
+            return
+        values = _store.values
+        values[slot] += value
+        values[slot + 1 + bisect_left(self.buckets, value)] += 1
+
+
+def collect():
+    """{(name, label values): summed slot values} across every process's file."""
+    totals = defaultdict(lambda: None)
+    directory = settings.METRICS_DIR
+    if not directory:
+        sources = [(_store.values.tolist(), _store_keys())] if _store else []
+    else:
+        sources = []
+        for keys_path in Path(directory).glob('*.keys'):
+            if keys_path.stem.isdigit() and not pid_alive(int(keys_path.stem)):
+                keys_path.unlink(missing_ok=True)
+                keys_path.with_suffix('.values').unlink(missing_ok=True)
+                continue
+            try:
+                keys = [json.loads(line) for line in keys_path.read_text().splitlines() if line.endswith(']')]
+                raw = keys_path.with_suffix('.values').read_bytes()
+            except (OSError, ValueError):
+                continue  # process gone mid-read
+            sources.append((array('d', raw[:len(raw) // 8 * 8]).tolist(), keys))
+
+    for values, keys in sources:
+        slot = 0
+        for name, labels, size in keys:
+            chunk = values[slot:slot + size]
+            slot += size
+            key = (name, tuple(labels))
+            current = totals[key]
+            totals[key] = chunk if current is None else [a + b for a, b in zip(current, chunk)]
+    return totals
+
+
+def _store_keys():
+    keys = []
+    for metric in REGISTRY.values():
+        for labels, slot in metric._slots.items():
+            keys.append((slot, [metric.name, list(labels), metric.size]))
+    return [key for _, key in sorted(keys)]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_metrics():
+    """The Prometheus text exposition format (version 0.0.4)."""
+    totals = collect()
+    by_metric = defaultdict(list)
+    for (name, labels), values in totals.items():
+        by_metric[name].append((labels, values))
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, values in sorted(by_metric[name]):
+            if metric.kind == 'counter':
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(values[0])}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ('+Inf',), values[1:]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, [('le', le)])} {_number(cumulative)}")
+            lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {_number(values[0])}")
+            lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+class _QueryCount:
+    def __init__(self):
+        self.count = 0
+        self._token = _current_query_count.set(self)
+
+    def stop(self):
+        _current_query_count.reset(self._token)
+        return self.count
+
+
+# A context variable rather than a per-request execute_wrapper: async views
+# run their queries in worker threads, each with its own connection, but
+# the context (and so this counter) follows them there.
+_current_query_count = ContextVar('current_query_count', default=None)
+
+
+def count_request_queries():
+    """Starts counting this request's queries; call .stop() on the result for the total."""
+    return _QueryCount()
+
+
+def count_query(execute, sql, params, many, context):
+    """Permanent execute wrapper, installed on each connection by core.signals."""
+    counter = _current_query_count.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+# The application's metrics
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'Responses by URL name, method and status code.', ('view', 'method', 'status'),
+)
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by URL name.', ('view',),
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL queries run while serving requests, by URL name.', ('view',))
+EMAILS_SENT = Counter('emails_sent_total', 'Outbound emails, by kind. One per message, not per recipient.', ('kind',))
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache use and result (hit/miss).', ('cache', 'result'))
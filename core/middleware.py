@@ -0,0 +1,252 @@
+import logging
+import math
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .models import Donor, Hospital
+from .routers import replica_configured
+from .instrumentation import QueryRecorder, get_query_budget, record_view_queries
+from .metrics import CACHE_REQUESTS, DB_QUERIES, HTTP_LATENCY, HTTP_REQUESTS, count_request_queries
+from .profiling import RequestProfile, wants_profile
+from .ratelimit import check_rate_limits, get_store
+
+logger = logging.getLogger(__name__)
+
+
+# Session key holding the logged-in email for each identity model
+SESSION_IDENTITIES = {
+    'donor': (Donor, 'donor_email'),
+    'hospital': (Hospital, 'hospital_email'),
+}
+
+
+def _identity_cache_key(model, email):
+    return f"identity:{model._meta.model_name}:{email}"
+
+
+def get_session_identity(request, model, session_key):
+    """
+    Returns the Donor/Hospital logged in through this session, or None.
+    The instance is cached for IDENTITY_CACHE_SECONDS so repeat requests
+    don't hit the database. Saving or deleting it through the ORM drops the
+    entry, but only in that worker's cache when it is per-process (locmem),
+    and .update() writes never do; the short lifetime bounds how stale other
+    workers' copies get. The password hash is left out of the cached copy
+    (deferred, so it is loaded if something asks for it).
+    """
+    email = request.session.get(session_key)
+    if not email:
+        return None
+
+    key = _identity_cache_key(model, email)
+    obj = cache.get(key)
+    CACHE_REQUESTS.inc('identity', 'miss' if obj is None else 'hit')
+    if obj is None:
+        obj = model.objects.defer('password').filter(email=email).first()
+        if obj is None:
+            return None
+        cache.set(key, obj, settings.IDENTITY_CACHE_SECONDS)
+    return obj
+
+
+def forget_identity(model, email):
+    """Drops the cached identity for this email (called on profile edits)."""
+    cache.delete(_identity_cache_key(model, email))
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively in both WSGI and ASGI stacks:
+    process_request/process_response run inline either way. (Django's
+    MiddlewareMixin pushes them to a thread under ASGI.) Subclasses must keep
+    both hooks free of blocking I/O.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        return self.process_response(request, await self.get_response(request))
+
+    def process_request(self, request):
+        pass
+
+    def process_response(self, request, response):
+        return response
+
+
+class SessionIdentityMiddleware(HybridMiddleware):
+    """
+    Attaches request.donor and request.hospital, resolved lazily from the
+    session on first access. Both are falsy when nobody is logged in.
+    (Resolving hits the cache/database, so async views mustn't touch them.)
+    """
+
+    def process_request(self, request):
+        for attr, (model, session_key) in SESSION_IDENTITIES.items():
+            setattr(request, attr, SimpleLazyObject(
+                lambda model=model, session_key=session_key: get_session_identity(request, model, session_key)
+            ))
+
+
+class ReplicaStickinessMiddleware(HybridMiddleware):
+    """
+    Read-your-writes for replica routing: after a POST (or other unsafe
+    method) the browser gets a short-lived cookie, and while it is present
+    @replica_reads views read from the primary instead of the replica.
+    A cookie is used so that pinning costs no session write.
+    """
+    cookie_name = 'pin_primary'
+
+    def process_request(self, request):
+        request.pinned_to_primary = (
+            self.cookie_name in request.COOKIES
+            or request.method not in ('GET', 'HEAD', 'OPTIONS')
+        )
+
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and replica_configured():
+            response.set_cookie(
+                self.cookie_name, str(int(time.time())),
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in (settings.QUERY_INSTRUMENTATION): counts and times every SQL query
+    a request makes, adds X-Query-Count and a Server-Timing header, and
+    keeps per-view totals for the query metrics page. Should sit near the
+    top of MIDDLEWARE so session and identity lookups are counted too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match is None:
+            return response
+        budget = get_query_budget(match.func)
+        record_view_queries(match.view_name, recorder, budget)
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['Server-Timing'] = f'db;dur={recorder.total_time * 1000:.2f};desc="{recorder.count} queries"'
+        if budget is not None and recorder.count > budget:
+            response['X-Query-Budget-Exceeded'] = f'{recorder.count}/{budget}'
+            logger.warning(
+                "%s ran %d queries (budget %d)", match.view_name, recorder.count, budget,
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (settings.PROFILING): runs selected requests under cProfile and
+    saves the capture to PROFILING_DIR. A request is selected when a staff
+    user sends the PROFILING_HEADER, or by PROFILING_SAMPLE_RATE. Goes last
+    in MIDDLEWARE so it wraps just the view (and its template rendering).
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+
+        with RequestProfile() as profile:
+            response = self.get_response(request)
+
+        summary = profile.summary(request, response)
+        profile_id = profile.save(summary)
+        timing = (
+            f'view;dur={summary["total_ms"]}, tpl;dur={summary["template_ms"]}, '
+            f'sql;dur={summary["sql_ms"]};desc="{summary["sql_count"]} queries"'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+        response['X-Profile-Id'] = profile_id
+        return response
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Feeds the /metrics counters: responses and latency per URL name, and the
+    SQL queries each request ran. Goes first in MIDDLEWARE so the latency
+    covers every other middleware too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request._metrics_started = time.perf_counter()
+        request._metrics_queries = count_request_queries()
+
+    def process_response(self, request, response):
+        elapsed = time.perf_counter() - request._metrics_started
+        queries = request._metrics_queries.stop()
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        HTTP_REQUESTS.inc(view, request.method, response.status_code)
+        HTTP_LATENCY.observe(elapsed, view)
+        if queries:
+            DB_QUERIES.inc(view, amount=queries)
+        return response
+
+
+class RateLimitMiddleware(HybridMiddleware):
+    """
+    Token-bucket limits on the public write endpoints (settings.RATE_LIMITS,
+    by URL name); over-limit POSTs get a 429 before the view, or CSRF, runs.
+    Safe methods are never limited. Off with RATE_LIMIT=0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.RATE_LIMIT:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.store = get_store()
+
+    # A sync hook: Django runs it in a thread under ASGI, as the store may block
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        wait = check_rate_limits(self.store, request, request.resolver_match.view_name)
+        if not wait:
+            return None
+        response = HttpResponse(
+            "Too many requests. Please wait a moment and try again.", status=429, content_type='text/plain',
+        )
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
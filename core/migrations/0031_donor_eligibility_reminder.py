@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_remove_bloodstock_blood_group_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donor',
+            name='eligibility_reminder_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='donor',
+            name='last_donation_date',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
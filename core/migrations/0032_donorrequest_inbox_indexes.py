@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_donor_eligibility_reminder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donorrequest',
+            index=models.Index(fields=['hospital', 'status', 'created_at'], name='donorreq_inbox_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donorrequest',
+            index=models.Index(fields=['hospital', 'created_at'], name='donorreq_inbox_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:11
+
+from itertools import islice
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+def log_existing_rows(apps, schema_editor):
+    # Rows saved before the log existed, so that syncing from cursor 0
+    # gives a client a full copy. updated_at only arrives in 0035, so these
+    # payloads don't have it; a row's next save logs one that does.
+    ChangeLog = apps.get_model('core', 'ChangeLog')
+    for model_name, name in (('BloodStock', 'stock'), ('BloodRequest', 'request')):
+        model = apps.get_model('core', model_name)
+        fields = [field.attname for field in model._meta.concrete_fields]
+        entries = (
+            ChangeLog(model=name, object_id=row['id'], action='upsert', data=row)
+            for row in model.objects.order_by('pk').values(*fields).iterator(chunk_size=2000)
+        )
+        while batch := list(islice(entries, 2000)):
+            ChangeLog.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=30)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted')], max_length=10)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'id'], name='changelog_model_cursor_idx')],
+            },
+        ),
+        migrations.RunPython(log_existing_rows, migrations.RunPython.noop),
+    ]
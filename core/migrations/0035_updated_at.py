@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:13
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_requests(apps, schema_editor):
+    # Existing stock and hospitals get "now"; requests were last touched when created
+    BloodRequest = apps.get_model('core', 'BloodRequest')
+    BloodRequest.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bloodrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='bloodstock',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='hospital',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_requests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:23
+
+from django.db import migrations, models
+
+
+def purge_deleted_rows(apps, schema_editor):
+    # Entries for rows deleted before deletes cleaned up after themselves
+    ChangeLog = apps.get_model('core', 'ChangeLog')
+    for model_name, name in (('BloodStock', 'stock'), ('BloodRequest', 'request')):
+        model = apps.get_model('core', model_name)
+        ChangeLog.objects.filter(model=name, action='upsert').exclude(
+            object_id__in=model.objects.values('pk'),
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['model', 'object_id'], name='changelog_row_idx'),
+        ),
+        migrations.RunPython(purge_deleted_rows, migrations.RunPython.noop),
+    ]
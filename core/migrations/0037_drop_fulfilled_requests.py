@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:23
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_changelog_purge_deleted'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailyrollup',
+            name='fulfilled_requests',
+        ),
+    ]
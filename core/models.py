@@ -1,13 +1,15 @@
 from django.db import models
 from django.db import models
 import uuid
-from django.contrib.auth.hashers import make_password, check_password
+from django.core.serializers.json import DjangoJSONEncoder
+from .credentials import PasswordMixin
+from .images import variant_url
 from django.utils import timezone
 from datetime import timedelta
 from django.db import models
 import uuid
 
-class Donor(models.Model):
+class Donor(PasswordMixin, models.Model):
     # Basic Info
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
@@ -30,20 +32,25 @@ class Donor(models.Model):
     available = models.BooleanField(default=True)
 
     # 🩸 New field
-    last_donation_date = models.DateField(null=True, blank=True)
+    last_donation_date = models.DateField(null=True, blank=True, db_index=True)
+
+    # Eligibility date the last re-eligibility reminder was sent for
+    eligibility_reminder_date = models.DateField(null=True, blank=True)
+
+    DONATION_COOLDOWN_DAYS = 90
 
     def is_eligible(self):
         """Check if donor is eligible to donate again (after 90 days)."""
         if not self.last_donation_date:
             return True
-        next_eligible_date = self.last_donation_date + timedelta(days=90)
+        next_eligible_date = self.last_donation_date + timedelta(days=self.DONATION_COOLDOWN_DAYS)
         return timezone.now().date() >= next_eligible_date
 
     def next_eligible_date(self):
         """Returns the next eligible donation date."""
         if not self.last_donation_date:
             return None
-        return self.last_donation_date + timedelta(days=90)
+        return self.last_donation_date + timedelta(days=self.DONATION_COOLDOWN_DAYS)
     
     # Authentication & Verification
     password = models.CharField(max_length=128)  # Hashed password
@@ -53,6 +60,16 @@ class Donor(models.Model):
     # Profile Image
     profile_pic = models.ImageField(upload_to="profile_pics/", blank=True, null=True)
 
+    def profile_pic_url(self, variant='thumb'):
+        """URL of a small WebP variant, falling back to the original upload."""
+        if not self.profile_pic:
+            return ''
+        return variant_url(self.profile_pic.name, variant) or self.profile_pic.url
+
+    @property
+    def profile_pic_thumb_url(self):
+        return self.profile_pic_url('thumb')
+
     # Donor Engagement / Badge System
     total_donations = models.PositiveIntegerField(default=0)
     BADGE_CHOICES = [
@@ -126,27 +143,24 @@ class BloodRequest(models.Model):
     contact_number = models.CharField(max_length=15)
     age = models.PositiveIntegerField()  
     gender = models.CharField(max_length=10)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Indexed for the 24-hour request list and delete_old_requests
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     state = models.CharField(max_length=50)     
     district = models.CharField(max_length=50) 
     status = models.CharField(max_length=20, default="pending")    
     urgent = models.BooleanField(default=False)
+    # Conditional GETs of the request list compare MAX(updated_at)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self):
         return f"{self.patient_name} - {self.blood_group_needed}"
 
-class Hospital(models.Model):
+class Hospital(PasswordMixin, models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15)
     location = models.CharField(max_length=200)
     password = models.CharField(max_length=255)  
-
-    def set_password(self, raw_password):
-        self.password = make_password(raw_password)
-        self.save()
-
-    def check_password(self, raw_password):
-        return check_password(raw_password, self.password)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -155,7 +169,7 @@ class Hospital(models.Model):
 
 class Donation(models.Model):
     donor = models.ForeignKey('Donor', on_delete=models.CASCADE)
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(auto_now_add=True, db_index=True)
     location = models.CharField(max_length=255, blank=True)
 
     def __str__(self):
@@ -187,6 +201,14 @@ class DonorRequest(models.Model):
     status = models.CharField(max_length=10, choices=status_choices, default="Pending")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)  
+
+    class Meta:
+        indexes = [
+            # Hospital inbox: newest first, optionally filtered by status
+            models.Index(fields=['hospital', 'status', 'created_at'], name='donorreq_inbox_status_idx'),
+            models.Index(fields=['hospital', 'created_at'], name='donorreq_inbox_idx'),
+        ]
+
     def __str__(self):
         return f"{self.donor_name} - {self.hospital.name}"
     
@@ -213,6 +235,69 @@ class BloodStock(models.Model):
     blood_type = models.CharField(max_length=5)
     units = models.PositiveIntegerField(default=0)
     expiry_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def is_expired(self):
+        return self.expiry_date < timezone.localdate()
+
+    def __str__(self):
+        return f"{self.hospital.name} - {self.blood_type}"
+
+
+class DailyRollup(models.Model):
+    """
+    Donation and blood request counts per day, place and blood group, kept up
+    to date by `manage.py rollup_stats` (see core/rollups.py). The analytics
+    dashboard reads only this table.
+    """
+    day = models.DateField()
+    state = models.CharField(max_length=50)
+    district = models.CharField(max_length=50)
+    blood_group = models.CharField(max_length=10)
+    donations = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    urgent_requests = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'state', 'district', 'blood_group'], name='dailyrollup_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.district} {self.blood_group}"
+
+
+class RollupWatermark(models.Model):
+    """The highest id of each source table already counted into DailyRollup."""
+    source = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_id}"
+
+
+class ChangeLog(models.Model):
+    """
+    Record of every save and delete of BloodStock and BloodRequest, written
+    by core.signals. The id doubles as the sync cursor for /changes (see
+    core/changelog.py). Deleting a row drops its earlier entries, so only the
+    delete itself is kept.
+    """
+    ACTIONS = [('upsert', 'Created or updated'), ('delete', 'Deleted')]
+
+    model = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)  # the row after the change; null for deletes
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'id'], name='changelog_model_cursor_idx'),
+            models.Index(fields=['model', 'object_id'], name='changelog_row_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.hospital.name} - {self.blood_type}"
\ No newline at end of file
+        return f"#{self.pk} {self.action} {self.model} {self.object_id}"
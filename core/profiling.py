@@ -0,0 +1,114 @@
+# core/profiling.py
+# On-demand cProfile capture for single requests, used by ProfilingMiddleware
+# and `manage.py profile_report`. Each capture is a .prof file (pstats) plus a
+# .json sidecar with the request details and the time split.
+
+import cProfile
+import json
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import Template
+from django.utils import timezone
+
+from .instrumentation import QueryRecorder
+
+# pstats key of Template.render; includes recurse into it, which cProfile
+# already folds into one cumulative time
+_TEMPLATE_RENDER = (
+    Template.render.__code__.co_filename,
+    Template.render.__code__.co_firstlineno,
+    Template.render.__code__.co_name,
+)
+
+
+def profile_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def wants_profile(request):
+    """Staff asked for it with the profiling header, or the sampler picked it."""
+    if request.headers.get(settings.PROFILING_HEADER):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class RequestProfile:
+    """
+    Profiles whatever runs inside the `with` block on this thread, and times
+    its SQL separately through QueryRecorder.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.queries = QueryRecorder()
+        self.total = 0.0
+
+    def __enter__(self):
+        self.queries.__enter__()
+        self._start = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.total = time.perf_counter() - self._start
+        self.queries.__exit__(*exc)
+        return False
+
+    def template_time(self):
+        self.profiler.create_stats()
+        stats = self.profiler.stats.get(_TEMPLATE_RENDER)
+        return stats[3] if stats else 0.0  # cumulative time
+
+    def summary(self, request, response):
+        match = request.resolver_match
+        return {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'captured_at': timezone.now().isoformat(),
+            'total_ms': round(self.total * 1000, 2),
+            'sql_ms': round(self.queries.total_time * 1000, 2),
+            'sql_count': self.queries.count,
+            'template_ms': round(self.template_time() * 1000, 2),
+        }
+
+    def save(self, summary):
+        """Writes <id>.prof and <id>.json into PROFILING_DIR and returns the id."""
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^\w.-]+', '-', summary['view'] or 'unresolved')
+        profile_id = f"{timezone.now():%Y%m%dT%H%M%S%f}-{slug}"
+        self.profiler.dump_stats(directory / f"{profile_id}.prof")
+        (directory / f"{profile_id}.json").write_text(json.dumps(summary, indent=2))
+        return profile_id
+
+
+def saved_profiles(view=None):
+    """(id, summary) pairs for the captures on disk, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    found = []
+    for meta in sorted(directory.glob('*.json'), reverse=True):
+        if not meta.with_suffix('.prof').exists():
+            continue
+        summary = json.loads(meta.read_text())
+        if view is None or summary.get('view') == view:
+            found.append((meta.stem, summary))
+    return found
+
+
+def load_stats(profile_ids):
+    """Merges several captures into one pstats.Stats."""
+    paths = [str(profile_dir() / f"{profile_id}.prof") for profile_id in profile_ids]
+    return pstats.Stats(*paths) if paths else None
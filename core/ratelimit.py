@@ -0,0 +1,146 @@
+# core/ratelimit.py
+# Token buckets for RateLimitMiddleware. Each rule in settings.RATE_LIMITS
+# gives a bucket of `burst` tokens that refills evenly over `seconds`; a
+# request takes one token from every bucket it falls in and is refused (429)
+# when any of them is empty. Buckets live in one of two stores, picked with
+# settings.RATE_LIMIT_STORE:
+#
+#   cache   the 'ratelimit' cache alias. Local memory by default, so each
+#           worker process counts on its own; point the alias at a shared
+#           cache to count across workers.
+#   sqlite  a small SQLite file (RATE_LIMIT_DB) shared by every worker on the
+#           host. Each take is one atomic UPSERT, so two workers can't both
+#           spend the last token.
+
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def client_ip(request):
+    """
+    The address buckets are keyed on. Behind a reverse proxy, set
+    RATE_LIMIT_IP_HEADER to the header it sets (e.g. HTTP_X_FORWARDED_FOR);
+    the last entry is used, as that's the one our own proxy appended.
+    """
+    header = settings.RATE_LIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class CacheBucketStore:
+    """Buckets as (tokens, updated) pairs in a Django cache."""
+
+    def __init__(self, alias='ratelimit'):
+        self.cache = caches[alias]
+        # get + set isn't atomic; this only covers threads of one process
+        self._lock = threading.Lock()
+
+    def take(self, key, burst, seconds):
+        """Takes a token. Returns 0 if there was one, else the seconds until there is."""
+        rate = burst / seconds
+        now = time.time()
+        with self._lock:
+            tokens, updated = self.cache.get(key) or (burst, now)
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            self.cache.set(key, (tokens - 1, now), seconds)
+        return 0
+
+    def give_back(self, key, burst, seconds):
+        """Returns a token taken by take()."""
+        with self._lock:
+            bucket = self.cache.get(key)
+            if bucket:
+                self.cache.set(key, (min(burst, bucket[0] + 1), bucket[1]), seconds)
+
+
+class SQLiteBucketStore:
+    """Buckets as rows in a SQLite file, shared between processes."""
+
+    # Refills and takes in one statement; no row comes back when the bucket
+    # is empty, and then nothing is written either
+    TAKE = """
+        INSERT INTO bucket (key, tokens, updated) VALUES (:key, :burst - 1, :now)
+        ON CONFLICT (key) DO UPDATE
+            SET tokens = min(:burst, tokens + (:now - updated) * :rate) - 1, updated = :now
+            WHERE min(:burst, tokens + (:now - updated) * :rate) >= 1
+        RETURNING tokens
+    """
+
+    # Every this many takes, drop buckets that have refilled completely
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._takes = 0
+        self._takes_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # Losing the buckets in a crash only resets the limits, so skip fsyncs
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, burst, seconds):
+        """Takes a token. Returns 0 if there was one, else the seconds until there is."""
+        rate = burst / seconds
+        now = time.time()
+        conn = self._connection()
+        with self._takes_lock:
+            self._takes += 1
+            prune = self._takes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+        if conn.execute(self.TAKE, {'key': key, 'burst': burst, 'rate': rate, 'now': now}).fetchone():
+            return 0
+        tokens, updated = conn.execute("SELECT tokens, updated FROM bucket WHERE key = ?", (key,)).fetchone()
+        return (1 - min(burst, tokens + (now - updated) * rate)) / rate
+
+    def give_back(self, key, burst, seconds):
+        """Returns a token taken by take()."""
+        self._connection().execute(
+            "UPDATE bucket SET tokens = min(:burst, tokens + 1) WHERE key = :key", {'key': key, 'burst': burst},
+        )
+
+    def prune(self):
+        """Deletes buckets idle long enough to be full again, which is the same as having no row."""
+        longest = max((seconds for rules in settings.RATE_LIMITS.values() for _, _, seconds in rules), default=0)
+        self._connection().execute("DELETE FROM bucket WHERE updated < ?", (time.time() - longest,))
+
+
+def get_store():
+    if settings.RATE_LIMIT_STORE == 'sqlite':
+        return SQLiteBucketStore(settings.RATE_LIMIT_DB)
+    return CacheBucketStore()
+
+
+def check_rate_limits(store, request, view_name):
+    """
+    Takes a token from each of the view's buckets (settings.RATE_LIMITS).
+    Returns 0 when the request may go ahead, else the Retry-After in seconds.
+    Stops at the first empty bucket and gives back the tokens already taken,
+    so a refused request costs nothing: a client that is over its own limit
+    doesn't keep draining the endpoint-wide bucket, and the other way round.
+    """
+    taken = []
+    for scope, burst, seconds in settings.RATE_LIMITS.get(view_name, ()):
+        key = f"{view_name}:{client_ip(request)}" if scope == 'ip' else f"{view_name}:*"
+        wait = store.take(key, burst, seconds)
+        if wait:
+            for rule in taken:
+                store.give_back(*rule)
+            return wait
+        taken.append((key, burst, seconds))
+    return 0
@@ -0,0 +1,90 @@
+# core/rollups.py
+# Maintains DailyRollup: donations, blood requests and urgent requests per
+# (day, state, district, blood group).
+#
+# Each run counts only the rows added since the last run (ids above each
+# source's RollupWatermark), adds those counts onto the rollup rows, and
+# moves the watermarks, all in one transaction. Past days are never
+# recounted from the raw tables: delete_old_requests purges requests after
+# 24 hours, so for requests the rollups are the only record left, and a
+# recount would wipe it.
+#
+# Donations are never purged, so those can be counted again from scratch
+# (rebuild_donations) if they drift, e.g. after donors were deleted.
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncDate
+
+from .models import BloodRequest, DailyRollup, Donation, RollupWatermark
+
+COUNTERS = ('donations', 'requests', 'urgent_requests')
+KEY_FIELDS = ['day', 'state', 'district', 'blood_group']
+
+
+def _new_counts(watermarks):
+    """{(day, state, district, blood_group): {counter: n}} for rows above the watermarks."""
+    rows = {}
+
+    def add(key, **counts):
+        entry = rows.setdefault(key, dict.fromkeys(COUNTERS, 0))
+        for name, n in counts.items():
+            entry[name] += n
+
+    donations = (
+        Donation.objects.filter(pk__gt=watermarks['donation'].last_id)
+        .values_list('date', 'donor__state', 'donor__district', 'donor__blood_group')
+        .annotate(n=Count('pk'), last_id=Max('pk'))
+        .order_by()
+    )
+    for day, state, district, blood_group, n, last_id in donations:
+        add((day, state, district, blood_group), donations=n)
+        watermarks['donation'].last_id = max(watermarks['donation'].last_id, last_id)
+
+    requests = (
+        BloodRequest.objects.filter(pk__gt=watermarks['bloodrequest'].last_id)
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day', 'state', 'district', 'blood_group_needed')
+        .annotate(n=Count('pk'), urgent=Count('pk', filter=Q(urgent=True)), last_id=Max('pk'))
+        .order_by()
+    )
+    for day, state, district, blood_group, n, urgent, last_id in requests:
+        add((day, state, district, blood_group), requests=n, urgent_requests=urgent)
+        watermarks['bloodrequest'].last_id = max(watermarks['bloodrequest'].last_id, last_id)
+    return rows
+
+
+def run_rollup():
+    """Adds rows new since the last run to DailyRollup. Returns (first day touched or None, rollup rows written)."""
+    with transaction.atomic():
+        watermarks = {w.source: w for w in RollupWatermark.objects.select_for_update()}
+        for source in ('donation', 'bloodrequest'):
+            watermarks.setdefault(source, RollupWatermark(source=source))
+        counts = _new_counts(watermarks)
+        if not counts:
+            return None, 0
+
+        days = {key[0] for key in counts}
+        for rollup in DailyRollup.objects.filter(day__in=days):
+            entry = counts.get((rollup.day, rollup.state, rollup.district, rollup.blood_group))
+            if entry:
+                for name in COUNTERS:
+                    entry[name] += getattr(rollup, name)
+        DailyRollup.objects.bulk_create(
+            (
+                DailyRollup(day=day, state=state, district=district, blood_group=blood_group, **entry)
+                for (day, state, district, blood_group), entry in counts.items()
+            ),
+            batch_size=1000,
+            update_conflicts=True, unique_fields=KEY_FIELDS, update_fields=list(COUNTERS),
+        )
+        for watermark in watermarks.values():
+            watermark.save()
+    return min(days), len(counts)
+
+
+def rebuild_donations():
+    """Zeroes the donation counters so the next run_rollup() counts every donation again."""
+    with transaction.atomic():
+        DailyRollup.objects.update(donations=0)
+        RollupWatermark.objects.filter(source='donation').delete()
@@ -0,0 +1,84 @@
+# core/routers.py
+# Primary/replica database routing. Writes always go to "default"; reads go
+# to "replica" only inside use_replica() / @replica_reads, and only when a
+# replica is configured.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+# Sessions and auth rows must be read back right after they're written
+PRIMARY_ONLY_APPS = {'sessions', 'auth', 'contenttypes', 'admin'}
+
+_reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """
+    Routes reads made inside the block to the replica, e.g.
+
+        with use_replica():
+            rows = list(BloodRequest.objects.filter(...))
+    """
+    token = _reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _reading_from_replica.reset(token)
+
+
+def replica_reads(view):
+    """
+    View decorator for read-only pages. Requests pinned to the primary by
+    ReplicaStickinessMiddleware (a recent POST from the same browser) keep
+    reading from the primary, so users always see their own writes.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_inner(request, *args, **kwargs):
+            if getattr(request, 'pinned_to_primary', False):
+                return await view(request, *args, **kwargs)
+            with use_replica():
+                return await view(request, *args, **kwargs)
+        return async_inner
+
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if getattr(request, 'pinned_to_primary', False):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+    return inner
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            _reading_from_replica.get()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+            and replica_configured()
+        ):
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema from sync_replica, not migrate
+        return db == 'default'
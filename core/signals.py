@@ -1,10 +1,43 @@
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
 
-from .models import BloodRequest, Donor
+from .models import BloodRequest, BloodStock, Donor, Hospital
+from .changelog import record_change
+from .metrics import EMAILS_SENT, count_query
+from .middleware import forget_identity
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    # Fires again on reconnect, with the wrapper list kept. Inserted at the
+    # bottom: connecting can happen inside a `with execute_wrapper(...)`
+    # block, which pops the last entry when it exits.
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+@receiver([post_save, post_delete], sender=Donor)
+@receiver([post_save, post_delete], sender=Hospital)
+def invalidate_session_identity(sender, instance, **kwargs):
+    # Cached request.donor / request.hospital must not outlive a profile edit
+    forget_identity(sender, instance.email)
+
+
+@receiver(post_save, sender=BloodStock)
+@receiver(post_save, sender=BloodRequest)
+def log_saved_change(sender, instance, **kwargs):
+    record_change(instance, 'upsert')
+
+
+@receiver(post_delete, sender=BloodStock)
+@receiver(post_delete, sender=BloodRequest)
+def log_deleted_change(sender, instance, **kwargs):
+    record_change(instance, 'delete')
+
 
 @receiver(post_save, sender=BloodRequest)
 def send_urgent_blood_request_email(sender, instance, created, **kwargs):
@@ -35,4 +68,4 @@ def send_urgent_blood_request_email(sender, instance, created, **kwargs):
                 recipient_list,
             )
             email.content_subtype = 'html'  # Send as HTML
-            email.send(fail_silently=False)
+            EMAILS_SENT.inc('urgent_request', amount=email.send(fail_silently=False))
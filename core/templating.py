@@ -0,0 +1,48 @@
+# core/templating.py
+# Compiles every project template into the cached loader at startup, so the
+# first request for each page doesn't pay for parsing. Called from wsgi.py and
+# asgi.py when settings.TEMPLATE_WARMUP is on; also used by bench_templates.
+
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+
+def project_template_names(engine=None):
+    """Template names under the project's own template dirs (DIRS and our apps, not Django's)."""
+    engine = engine or engines['django'].engine
+    base = Path(settings.BASE_DIR).resolve()
+    names = set()
+    for directory in [*engine.dirs, *get_app_template_dirs('templates')]:
+        directory = Path(directory).resolve()
+        if not directory.is_relative_to(base) or not directory.is_dir():
+            continue
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    names.add(Path(root, filename).relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def warm_template_cache():
+    """Loads (and so compiles and caches) every project template. Returns how many loaded."""
+    engine = engines['django'].engine
+    start = time.perf_counter()
+    loaded = 0
+    for name in project_template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            # Don't stop the server over it; the page will raise on first use too
+            logger.exception("Template %s failed to compile during warm-up", name)
+            continue
+        loaded += 1
+    logger.info("Compiled %d templates in %.0fms", loaded, (time.perf_counter() - start) * 1000)
+    return loaded
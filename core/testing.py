@@ -0,0 +1,34 @@
+# core/testing.py
+# Helpers for the project's TestCases.
+
+from django.urls import resolve
+
+from .instrumentation import QueryRecorder, get_query_budget
+
+
+class QueryBudgetMixin:
+    """
+    Mix into a django.test.TestCase to check views against the budget they
+    declare with @query_budget:
+
+        class LiveStockTests(QueryBudgetMixin, TestCase):
+            def test_query_budget(self):
+                self.assertWithinQueryBudget(reverse('live_stock'))
+
+    Queries are counted on every database alias, the same way the
+    instrumentation middleware counts them.
+    """
+
+    def assertWithinQueryBudget(self, path, method='get', data=None, budget=None, **extra):
+        if budget is None:
+            budget = get_query_budget(resolve(path.split('?')[0]).func)
+            if budget is None:
+                self.fail(f"{path} has no @query_budget and no budget was passed.")
+
+        with QueryRecorder() as recorder:
+            response = getattr(self.client, method)(path, data, **extra)
+
+        if recorder.count > budget:
+            listing = '\n'.join(f"{i}. {sql}" for i, (sql, _) in enumerate(recorder.queries, 1))
+            self.fail(f"{path} ran {recorder.count} queries, budget is {budget}:\n{listing}")
+        return response
@@ -1,3 +1,613 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core import mail
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .checks import check_session_cache
+from .datagen import seed_database
+from .eligibility import BOUNDS, FLAG_FIELDS, NUMERIC_FIELDS, RULES, ineligibility_reasons, screen_columns
+from .forms import DetailedHealthCheckForm
+from .credentials import TunedPBKDF2PasswordHasher, hash_password
+from .models import (
+    BloodRequest, BloodStock, ChangeLog, DailyRollup, Donation, Donor, DonorRequest, Feedback, Hospital, RollupWatermark,
+)
+from .rollups import COUNTERS, KEY_FIELDS, run_rollup
+from .ratelimit import CacheBucketStore, SQLiteBucketStore, check_rate_limits
+from .testing import QueryBudgetMixin
+from . import ratelimit, writebehind
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Every view with a @query_budget, run against a few rows of everything so N+1s show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.hospitals = [
+            Hospital.objects.create(
+                name=f"Hospital {i}", email=f"h{i}@example.com", phone="0495000000", location="Kozhikode", password="x",
+            )
+            for i in range(3)
+        ]
+        cls.donor = None
+        for i in range(3):
+            donor = Donor.objects.create(
+                name=f"Donor {i}", email=f"d{i}@example.com", phone="9000000000", gender="Male",
+                state="Kerala", district="Kozhikode", blood_group="O+", location="Kozhikode", password="x",
+            )
+            cls.donor = cls.donor or donor
+            for _ in range(2):
+                Donation.objects.create(donor=donor, location="Kozhikode")
+        for hospital in cls.hospitals:
+            for blood_type in ('A+', 'O+'):
+                BloodStock.objects.create(hospital=hospital, blood_type=blood_type, units=5, expiry_date=today + timedelta(days=10))
+            for name in ('Asha', 'Binu'):
+                DonorRequest.objects.create(
+                    hospital=hospital, donor_name=name, donor_age=30, donor_blood_group='O+', donor_contact='9000000000',
+                )
+        for i in range(3):
+            BloodRequest.objects.create(
+                patient_name=f"Patient {i}", hospital_name="Hospital 0", blood_group_needed="O+", location="Kozhikode",
+                contact_number="9000000000", age=40, gender="Female", state="Kerala", district="Kozhikode", urgent=i == 0,
+            )
+        for day in range(3):
+            DailyRollup.objects.create(
+                day=today - timedelta(days=day), state="Kerala", district="Kozhikode", blood_group="O+", donations=2, requests=1,
+            )
+        cls.staff = User.objects.create_user('staff', password='x', is_staff=True)
+
+    def setUp(self):
+        # Identities are cached between requests; start every test cold
+        caches['default'].clear()
+
+    def log_in(self, key, email):
+        session = self.client.session
+        session[key] = email
+        session.save()
+
+    def test_public_pages(self):
+        for path in (
+            reverse('home'),
+            reverse('search_donors') + '?blood_group=O%2B&state=Kerala',
+            reverse('blood_requests_list') + '?blood_group=O%2B',
+            reverse('hospital_list'),
+            reverse('hospital_list') + '?blood_type=A%2B&location=Kozhikode',
+            reverse('hospital_public_profile', args=[self.hospitals[0].pk]),
+            reverse('changes') + '?since=0',
+        ):
+            with self.subTest(path=path):
+                response = self.assertWithinQueryBudget(path)
+                self.assertEqual(response.status_code, 200)
+
+    def test_donor_profile(self):
+        self.log_in('donor_email', self.donor.email)
+        response = self.assertWithinQueryBudget(reverse('donor_profile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_hospital_pages(self):
+        self.log_in('hospital_email', self.hospitals[0].email)
+        for path in (reverse('hospital_profile'), reverse('analytics_dashboard')):
+            with self.subTest(path=path):
+                response = self.assertWithinQueryBudget(path)
+                self.assertEqual(response.status_code, 200)
+
+    def test_staff_analytics(self):
+        self.client.force_login(self.staff)
+        response = self.assertWithinQueryBudget(reverse('analytics_dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get_stays_within_budget(self):
+        path = reverse('hospital_list')
+        etag = self.client.get(path)['ETag']
+        response = self.assertWithinQueryBudget(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class SessionCacheCheckTests(SimpleTestCase):
+    def test_cached_sessions_need_a_shared_cache(self):
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db'):
+            self.assertEqual([e.id for e in check_session_cache(None)], ['core.E001'])
+        with override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}},
+        ):
+            self.assertEqual(check_session_cache(None), [])
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.assertEqual(check_session_cache(None), [])
+
+
+class WriteBehindTests(TestCase):
+    def setUp(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        self.spool = Path(spool.name)
+        self.enterContext(override_settings(WRITE_BEHIND=True, WRITE_BEHIND_DIR=spool.name, WRITE_BEHIND_MAX_DELAY=3600))
+        # No flusher thread: the tests call flush() themselves
+        self.enterContext(mock.patch.object(writebehind.threading, 'Thread'))
+        self.enterContext(mock.patch.dict(writebehind.BUFFERS))
+        self.buffer = writebehind.WriteBehindBuffer('core.Feedback')
+        self.addCleanup(self.buffer.close)
+
+    def feedback(self, n):
+        return Feedback(name=f"Visitor {n}", email=f"v{n}@example.com", message="Thanks")
+
+    def failing_once(self):
+        insert = self.buffer._insert
+        calls = []
+
+        def flaky(rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise Exception("database is locked")
+            insert(rows)
+        return mock.patch.object(self.buffer, '_insert', side_effect=flaky)
+
+    def test_failed_flush_is_retried(self):
+        self.buffer.add(self.feedback(1))
+        self.buffer.add(self.feedback(2))
+        with self.failing_once(), self.assertLogs('core.writebehind', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+            self.buffer.add(self.feedback(3))
+            self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(Feedback.objects.count(), 3)
+        self.assertEqual(list(self.spool.glob('*.flushing')), [])
+
+    def test_failed_recovery_is_retried_and_bad_files_set_aside(self):
+        row = {'name': 'Visitor', 'email': 'v@example.com', 'message': 'Hi', 'created_at': None}
+        (self.spool / 'core.Feedback.111.jsonl').write_text(json.dumps(row) + "\n")
+        (self.spool / 'core.Feedback.222.jsonl').write_text("not json\n")
+        (self.spool / 'core.Feedback.333.jsonl').write_text(json.dumps(row) + "\n")
+        with mock.patch.object(writebehind, 'pid_alive', return_value=False), self.failing_once():
+            with self.assertLogs('core.writebehind', 'ERROR') as logs:
+                recovered = self.buffer.recover()
+            self.assertEqual(len(logs.records), 2)  # the bad file and the failed insert
+            self.assertEqual(recovered + len(self.buffer._batches), 2)
+            self.assertEqual(self.buffer.flush(), 2 - recovered)
+        self.assertEqual(Feedback.objects.count(), 2)
+        self.assertEqual(len(list(self.spool.glob('*.bad'))), 1)
+        self.assertEqual(list(self.spool.glob('*.flushing')), [])
+
+
+# Cheap hashes for the tests; the code under test reads the class attribute
+@mock.patch.object(TunedPBKDF2PasswordHasher, 'iterations', 1000)
+class PasswordTests(TestCase):
+    def make_donor(self, password):
+        return Donor.objects.create(
+            name="Donor", email="donor@example.com", phone="9000000000", gender="Male", state="Kerala",
+            district="Kozhikode", blood_group="O+", location="Kozhikode", password=password,
+        )
+
+    def log_in(self, email, password, view='donor_login'):
+        return self.client.post(reverse(view), {'email': email, 'password': password})
+
+    def test_legacy_sha256_hash_is_upgraded_on_login(self):
+        donor = self.make_donor(hashlib.sha256(b'secret').hexdigest())
+        self.assertRedirects(self.log_in(donor.email, 'secret'), reverse('donor_profile'), fetch_redirect_response=False)
+        donor.refresh_from_db()
+        self.assertTrue(donor.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(donor.check_password('secret'))
+
+    def test_must_update_only_for_weaker_hashes(self):
+        hasher = TunedPBKDF2PasswordHasher()
+
+        def encoded(iterations, salt=None):
+            other = type('Other', (PBKDF2PasswordHasher,), {'iterations': iterations})()
+            return other.encode('secret', salt or hasher.salt())
+
+        self.assertFalse(hasher.must_update(encoded(1000)))
+        self.assertFalse(hasher.must_update(encoded(5000)))
+        self.assertTrue(hasher.must_update(encoded(999)))
+        self.assertTrue(hasher.must_update(encoded(1000, salt='short')))
+
+    def test_current_hash_is_not_rewritten_on_login(self):
+        donor = self.make_donor(hash_password('secret'))
+        stored = donor.password
+        self.log_in(donor.email, 'secret')
+        donor.refresh_from_db()
+        self.assertEqual(donor.password, stored)
+
+    def test_wrong_password_never_rewrites_the_hash(self):
+        weak = type('Weak', (PBKDF2PasswordHasher,), {'iterations': 500})()
+        for stored in (hashlib.sha256(b'secret').hexdigest(), weak.encode('secret', weak.salt())):
+            with self.subTest(stored=stored[:20]):
+                Donor.objects.all().delete()
+                donor = self.make_donor(stored)
+                self.log_in(donor.email, 'wrong')
+                donor.refresh_from_db()
+                self.assertEqual(donor.password, stored)
+                self.assertNotIn('donor_email', self.client.session)
+
+    def test_unknown_emails_cost_a_hash(self):
+        for view in ('donor_login', 'hospital_login'):
+            with self.subTest(view=view), mock.patch('core.views.reject_unknown_account', return_value=False) as reject:
+                self.log_in('nobody@example.com', 'secret', view)
+                reject.assert_called_once_with('secret')
+
+
+class RateLimitMixin:
+    """Run by CacheRateLimitTests and SQLiteRateLimitTests below, one per store."""
+
+    def setUp(self):
+        self.enterContext(override_settings(RATE_LIMIT=True, RATE_LIMITS={'feedback': [('ip', 2, 60)]}))
+
+    def post(self):
+        return self.client.post(reverse('feedback'), {})
+
+    def test_post_over_the_limit_gets_429(self):
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.post().status_code, 200)
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_get_is_never_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(reverse('feedback')).status_code, 200)
+        self.assertEqual(self.post().status_code, 200)
+
+    @override_settings(RATE_LIMITS={'feedback': [('ip', 2, 60), ('all', 1, 60)]})
+    def test_refused_request_gives_back_earlier_tokens(self):
+        store = self.make_store()
+        request = RequestFactory().post('/feedback/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(check_rate_limits(store, request, 'feedback'), 0)
+        for _ in range(3):
+            self.assertGreater(check_rate_limits(store, request, 'feedback'), 0)
+        # Only the first request kept its token from the per-ip bucket
+        self.assertEqual(store.take('feedback:10.0.0.1', 2, 60), 0)
+        self.assertGreater(store.take('feedback:10.0.0.1', 2, 60), 0)
+
+    def test_bucket_refills_over_time(self):
+        store = self.make_store()
+        with mock.patch.object(ratelimit, 'time') as clock:
+            clock.time.return_value = 1000.0
+            self.assertEqual(store.take('k', 2, 60), 0)
+            self.assertEqual(store.take('k', 2, 60), 0)
+            self.assertEqual(store.take('k', 2, 60), 30)
+            clock.time.return_value = 1015.0
+            self.assertEqual(store.take('k', 2, 60), 15)
+            clock.time.return_value = 1030.0
+            self.assertEqual(store.take('k', 2, 60), 0)
+            self.assertGreater(store.take('k', 2, 60), 0)
+
+
+@override_settings(RATE_LIMIT_STORE='cache')
+class CacheRateLimitTests(RateLimitMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches['ratelimit'].clear()
+        self.addCleanup(caches['ratelimit'].clear)
+
+    def make_store(self):
+        return CacheBucketStore()
+
+
+class SQLiteRateLimitTests(RateLimitMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = Path(tmp.name) / 'ratelimit.sqlite3'
+        self.enterContext(override_settings(RATE_LIMIT_STORE='sqlite', RATE_LIMIT_DB=self.db))
+
+    def make_store(self):
+        return SQLiteBucketStore(self.db)
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.hospital = Hospital.objects.create(
+            name="Hospital", email="h@example.com", phone="0495000000", location="Kozhikode", password="x",
+        )
+
+    def add_stock(self, units):
+        return BloodStock.objects.create(
+            hospital=self.hospital, blood_type="O+", units=units, expiry_date=timezone.localdate() + timedelta(days=30),
+        )
+
+    def feed(self, since=0, **params):
+        response = self.client.get(reverse('changes'), {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_resumes_after_the_last_id(self):
+        first, second = self.add_stock(1), self.add_stock(2)
+        page = self.feed(limit=1)
+        self.assertEqual([c['id'] for c in page['changes']], [first.pk])
+        self.assertTrue(page['more'])
+        page = self.feed(page['next'])
+        self.assertEqual([c['id'] for c in page['changes']], [second.pk])
+        self.assertFalse(page['more'])
+        third = self.add_stock(3)
+        page = self.feed(page['next'])
+        self.assertEqual([c['id'] for c in page['changes']], [third.pk])
+        self.assertEqual(self.feed(page['next'])['changes'], [])
+
+    def test_changes_to_one_row_collapse_to_the_latest(self):
+        stock, other = self.add_stock(1), self.add_stock(5)
+        for units in (2, 3):
+            stock.units = units
+            stock.save()
+        changes = self.feed()['changes']
+        # The row moves to where its latest change is
+        self.assertEqual([c['id'] for c in changes], [other.pk, stock.pk])
+        self.assertEqual(changes[1]['d']['units'], 3)
+        self.assertEqual(changes[1]['c'], ChangeLog.objects.latest('pk').pk)
+
+    def test_delete_purges_earlier_entries(self):
+        stock, other = self.add_stock(1), self.add_stock(5)
+        cursor = self.feed()['next']
+        stock.units = 2
+        stock.save()
+        pk = stock.pk
+        stock.delete()
+        self.assertEqual(list(ChangeLog.objects.filter(object_id=pk).values_list('action', 'data')), [('delete', None)])
+        # A client behind the delete gets only the delete...
+        delete = {'c': ChangeLog.objects.latest('pk').pk, 'm': 'stock', 'id': pk, 'op': 'd'}
+        self.assertEqual(self.feed(cursor)['changes'], [delete])
+        # ...and one starting from scratch never sees the row's data
+        self.assertEqual([(c['id'], c['op']) for c in self.feed()['changes']], [(other.pk, 'u'), (pk, 'd')])
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.donors = [
+            Donor.objects.create(
+                name=f"Donor {group}", email=f"{group}@example.com", phone="9000000000", gender="Male", state="Kerala",
+                district=district, blood_group=group, location=district, password="x",
+            )
+            for group, district in (('O+', 'Kozhikode'), ('A-', 'Wayanad'))
+        ]
+
+    def add_rows(self, days_ago):
+        day = timezone.localdate() - timedelta(days=days_ago)
+        for donor in self.donors:
+            donation = Donation.objects.create(donor=donor)
+            Donation.objects.filter(pk=donation.pk).update(date=day)
+            request = BloodRequest.objects.create(
+                patient_name="Patient", hospital_name="Hospital", blood_group_needed=donor.blood_group,
+                location=donor.district, contact_number="9000000000", age=40, gender="Female", state="Kerala",
+                district=donor.district, urgent=days_ago % 2 == 0,
+            )
+            BloodRequest.objects.filter(pk=request.pk).update(created_at=request.created_at - timedelta(days=days_ago))
+
+    def rollups(self):
+        return list(DailyRollup.objects.order_by(*KEY_FIELDS).values(*KEY_FIELDS, *COUNTERS))
+
+    def test_incremental_runs_match_a_full_rebuild(self):
+        self.add_rows(2)
+        self.add_rows(1)
+        run_rollup()
+        # New rows on a day already rolled up, and on a new one
+        self.add_rows(1)
+        self.add_rows(0)
+        run_rollup()
+        incremental = self.rollups()
+
+        DailyRollup.objects.all().delete()
+        RollupWatermark.objects.all().delete()
+        run_rollup()
+        self.assertEqual(self.rollups(), incremental)
+        self.assertEqual(sum(row['donations'] for row in incremental), 8)
+        self.assertEqual(sum(row['requests'] for row in incremental), 8)
+
+    def test_run_without_new_rows_is_a_no_op(self):
+        self.add_rows(0)
+        run_rollup()
+        before = self.rollups()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(run_rollup(), (None, 0))
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertEqual(self.rollups(), before)
+
+    def test_seeded_rows_are_rolled_up_and_logged(self):
+        seed_database(1, hospitals=2, donors=20, donations=30, blood_requests=40)
+        self.assertEqual(ChangeLog.objects.filter(model='request').count(), 40)
+        self.assertEqual(ChangeLog.objects.filter(model='stock').count(), BloodStock.objects.count())
+        totals = self.rollups()
+        self.assertEqual(sum(row['donations'] for row in totals), 30)
+        self.assertEqual(sum(row['requests'] for row in totals), 40)
+        self.assertEqual(run_rollup(), (None, 0))
+
+    def test_watermarks_advance(self):
+        self.add_rows(0)
+        self.assertEqual(run_rollup()[0], timezone.localdate())
+        watermarks = dict(RollupWatermark.objects.values_list('source', 'last_id'))
+        self.assertEqual(watermarks, {
+            'donation': Donation.objects.latest('pk').pk, 'bloodrequest': BloodRequest.objects.latest('pk').pk,
+        })
+        self.add_rows(0)
+        run_rollup()
+        self.assertEqual(
+            RollupWatermark.objects.get(source='donation').last_id, Donation.objects.latest('pk').pk,
+        )
+
+
+def legacy_reason(values):
+    """The health-check form's clean() before the rule table: the first failing number, else one message for any flag."""
+    age, weight, hemoglobin = values.get('age'), values.get('weight'), values.get('hemoglobin_level')
+    if age and (age < 18 or age > 65):
+        return "Age must be between 18 and 65."
+    if weight and weight < 50:
+        return "Minimum weight should be 50 kg."
+    if hemoglobin and hemoglobin < 12.5:
+        return "Hemoglobin must be at least 12.5 g/dL."
+    if any(values.get(field) for field in FLAG_FIELDS):
+        return "You are not eligible to donate at this time due to health reasons."
+    return None
+
+
+class EligibilityTests(TestCase):
+    EDGES = [
+        {'age': age, 'weight': weight, 'hemoglobin_level': hemoglobin, **dict.fromkeys(FLAG_FIELDS, False), **flags}
+        for age in (17, 18, 65, 66)
+        for weight in (49.9, 50)
+        for hemoglobin in (12.4, 12.5)
+        for flags in ({}, {'smoking': True})
+    ]
+
+    def test_rules_match_the_old_form(self):
+        for values in self.EDGES:
+            with self.subTest(values={k: v for k, v in values.items() if v}):
+                reasons, old = ineligibility_reasons(values), legacy_reason(values)
+                self.assertEqual(not reasons, old is None)
+                if old in {reason for *_, reason in RULES}:
+                    self.assertEqual(reasons[0], old)
+                elif old:
+                    self.assertEqual(reasons, ["Smoked in the last 24 hours."])
+
+                form = DetailedHealthCheckForm(values)
+                self.assertEqual(form.is_valid(), not reasons)
+                self.assertEqual(list(form.non_field_errors()), reasons)
+
+    def test_vectorized_screen_matches_compiled_rules(self):
+        import numpy as np
+
+        columns = {field: np.array([row[field] for row in self.EDGES], dtype=float) for field in NUMERIC_FIELDS}
+        columns.update({field: np.array([row[field] for row in self.EDGES], dtype=bool) for field in FLAG_FIELDS})
+        eligible, reasons = screen_columns(columns)
+        expected = [ineligibility_reasons(row) for row in self.EDGES]
+        self.assertEqual(reasons, expected)
+        self.assertEqual(list(eligible), [not r for r in expected])
+
+    def test_questionnaire_bounds_come_from_the_rules(self):
+        self.assertEqual(BOUNDS, {'age': {'min': 18, 'max': 65}, 'weight': {'min': 50}, 'hemoglobin_level': {'min': 12.5}})
+        html = self.client.get(reverse('detailed_health_check')).content.decode()
+        self.assertIn('name="age" min="18" max="65"', html)
+        self.assertIn('name="weight" min="50"', html)
+        self.assertIn('name="hemoglobin_level" step="0.1" min="12.5"', html)
+
+
+class CleanupProfilePicsTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = Path(media.name)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, PROFILE_PIC_CLEANUP_GRACE_SECONDS=3600))
+
+    def add_file(self, name, age):
+        path = self.media / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x')
+        mtime = (timezone.now() - timedelta(seconds=age)).timestamp()
+        os.utime(path, (mtime, mtime))
+        return name
+
+    def test_only_old_orphans_are_deleted(self):
+        kept = self.add_file('profile_pics/ab/kept.jpg', 7200)
+        Donor.objects.create(
+            name="Donor", email="d@example.com", phone="9000000000", gender="Male", state="Kerala",
+            district="Kozhikode", blood_group="O+", location="Kozhikode", password="x", profile_pic=kept,
+        )
+        variant = self.add_file('profile_pics/variants/kept_thumb.webp', 7200)
+        orphan = self.add_file('profile_pics/cd/orphan.jpg', 7200)
+        # Stored moments ago; its donor row may not have committed yet
+        fresh = self.add_file('profile_pics/ef/fresh.jpg', 60)
+
+        call_command('cleanup_profile_pics', stdout=io.StringIO())
+        self.assertTrue((self.media / kept).exists())
+        self.assertTrue((self.media / variant).exists())
+        self.assertFalse((self.media / orphan).exists())
+        self.assertTrue((self.media / fresh).exists())
+
+
+class BulkUpdateRequestsTests(TestCase):
+    def setUp(self):
+        self.hospital, self.other = [
+            Hospital.objects.create(
+                name=f"Hospital {i}", email=f"h{i}@example.com", phone="0495000000", location="Kozhikode", password="x",
+            )
+            for i in range(2)
+        ]
+        session = self.client.session
+        session['hospital_email'] = self.hospital.email
+        session.save()
+
+    def add_requests(self, hospital, n, status="Pending"):
+        return [
+            DonorRequest.objects.create(
+                hospital=hospital, donor_name=f"Donor {i}", donor_age=30, donor_blood_group="O+",
+                donor_contact="9000000000", status=status,
+            ).pk
+            for i in range(n)
+        ]
+
+    def post(self, ids, action='accept'):
+        return self.client.post(reverse('bulk_update_requests'), {'action': action, 'ids': ids})
+
+    def statuses(self, ids):
+        return list(DonorRequest.objects.filter(pk__in=ids).order_by('pk').values_list('status', flat=True))
+
+    def test_only_own_pending_requests_change(self):
+        pending = self.add_requests(self.hospital, 2)
+        rejected = self.add_requests(self.hospital, 1, status="Rejected")
+        others = self.add_requests(self.other, 2)
+        self.assertRedirects(self.post(pending + rejected + others), reverse('hospital_profile'), fetch_redirect_response=False)
+        self.assertEqual(self.statuses(pending), ["Accepted", "Accepted"])
+        self.assertEqual(self.statuses(rejected), ["Rejected"])
+        self.assertEqual(self.statuses(others), ["Pending", "Pending"])
+
+    def test_query_count_does_not_grow_with_selection(self):
+        counts = []
+        for n in (1, 50):
+            ids = self.add_requests(self.hospital, n)
+            caches['default'].clear()  # both runs look the hospital up again
+            with CaptureQueriesContext(connection) as queries:
+                self.post(ids, 'reject')
+            self.assertEqual(self.statuses(ids), ["Rejected"] * n)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class EligibilityReminderTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        cooldown = Donor.DONATION_COOLDOWN_DAYS
+        self.donors = {
+            days: Donor.objects.create(
+                name=f"Donor {days}", email=f"d{days}@example.com", phone="9000000000", gender="Male",
+                state="Kerala", district="Kozhikode", blood_group="O+", location="Kozhikode", password="x",
+                is_verified=True, last_donation_date=self.today - timedelta(days=days),
+            )
+            for days in (cooldown - 1, cooldown, cooldown + 1)
+        }
+
+    def remind(self, day=None):
+        mail.outbox = []
+        args = ['--date', day.isoformat()] if day else []
+        call_command('send_eligibility_reminders', *args, stdout=io.StringIO())
+        return sorted(to for message in mail.outbox for to in message.to)
+
+    def test_only_donors_eligible_that_day_are_reminded(self):
+        cooldown = Donor.DONATION_COOLDOWN_DAYS
+        self.assertEqual(self.remind(), [f"d{cooldown}@example.com"])
+        self.donors[cooldown].refresh_from_db()
+        self.assertEqual(self.donors[cooldown].eligibility_reminder_date, self.today)
+        # Tomorrow is the turn of the donor one day behind
+        self.assertEqual(self.remind(self.today + timedelta(days=1)), [f"d{cooldown - 1}@example.com"])
+
+    def test_second_run_on_the_same_day_sends_nothing(self):
+        self.assertEqual(len(self.remind()), 1)
+        self.assertEqual(self.remind(), [])
+
+    def test_next_cooldown_is_reminded_again(self):
+        donor = self.donors[Donor.DONATION_COOLDOWN_DAYS]
+        self.remind()
+        # Donated again on the day they became eligible
+        Donor.objects.filter(pk=donor.pk).update(last_donation_date=self.today)
+        later = self.today + timedelta(days=Donor.DONATION_COOLDOWN_DAYS)
+        self.assertEqual(self.remind(later), [donor.email])
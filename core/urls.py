@@ -37,6 +37,7 @@ urlpatterns = [
     path('hospital/<int:hospital_id>/', views.hospital_public_profile, name='hospital_public_profile'),
     path('accept_request/<int:req_id>/', views.accept_request, name='accept_request'),
     path('reject_request/<int:req_id>/', views.reject_request, name='reject_request'),
+    path('hospital/requests/bulk/', views.bulk_update_requests, name='bulk_update_requests'),
     
     # Donor requests visible to hospital authority
     path("hospital/<int:hospital_id>/donate/", views.donor_request_view, name="donor_request"),
@@ -52,6 +53,19 @@ urlpatterns = [
     path('hospital/manage_blood_stock/', views.manage_blood_stock, name='manage_blood_stock'),
     path('hospital/delete_stock/<int:stock_id>/', views.delete_blood_stock, name='delete_blood_stock'),
 
+    # Incremental sync feed for stock and requests
+    path('changes', views.changes, name='changes'),
+
+    # Analytics + exports (staff and hospitals)
+    path('analytics/', views.analytics_dashboard, name='analytics_dashboard'),
+    path('export/<str:name>/', views.export_data, name='export_data'),
+
+    # Internal (staff only)
+    path('internal/query-metrics/', views.query_metrics, name='query_metrics'),
+
+    # Prometheus scrape target
+    path('metrics', views.metrics, name='metrics'),
+
 
 ]
 
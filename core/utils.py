@@ -1,5 +1,7 @@
 # core/utils.py
 
+import os
+
 HOSPITAL_NAMES = [
     "Baby Memorial Hospital",
     "Aster MIMS",
@@ -22,3 +24,28 @@ HOSPITAL_NAMES = [
     "Care Hospital",
     "Almeida Hospital"
 ]
+
+BLOOD_TYPES = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+
+KERALA_DISTRICTS = [
+    "Thiruvananthapuram", "Kollam", "Pathanamthitta", "Alappuzha",
+    "Kottayam", "Idukki", "Ernakulam", "Thrissur", "Palakkad",
+    "Malappuram", "Kozhikode", "Wayanad", "Kannur", "Kasaragod",
+]
+
+# Approximate share of each blood group among Indian donors (%)
+BLOOD_GROUP_FREQUENCIES = {
+    'O+': 35.8, 'B+': 30.9, 'A+': 22.9, 'AB+': 7.1,
+    'O-': 1.4, 'B-': 1.1, 'A-': 0.6, 'AB-': 0.2,
+}
+
+
+def pid_alive(pid):
+    """Whether a process with this pid is running (on this machine)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,57 +1,91 @@
 # ==============================
 # Imports
 # ==============================
-import hashlib
+import hmac
 import uuid
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.utils import timezone
 from django.views.decorators.http import require_POST
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from datetime import timedelta
 from django.utils import timezone
+from django.conf import settings
 from .models import BloodStock
 
 
 from .models import (
-    Donor, BloodRequest, Hospital, Donation, DonorRequest, DonorHealthCheck, Feedback
+    Donor, BloodRequest, Hospital, Donation, DonorRequest, DonorHealthCheck, Feedback, DailyRollup
 )
 from .forms import (
     HospitalDonationRequestForm, DonorRequestForm, DetailedHealthCheckForm, FeedbackForm
 )
-from .utils import HOSPITAL_NAMES
+from .utils import HOSPITAL_NAMES, BLOOD_TYPES
+from .middleware import forget_identity
+from .routers import replica_reads
+from .instrumentation import query_budget, view_query_stats, reset_view_query_stats
+from .metrics import render_metrics
+from django.contrib.admin.views.decorators import staff_member_required
+from .credentials import hash_password, reject_unknown_account
+from .images import schedule_variants, store_profile_pic
+from .eligibility import BOUNDS, FLAG_FIELDS, NUMERIC_FIELDS, ineligibility_reasons
+from .writebehind import feedback_buffer
+from .exports import EXPORTS, FORMATS, aiter_export, export_filename, stream_export
+from .changelog import MAX_PAGE, TRACKED, changes_since
+from .conditional import conditional_list, table_version
+from django.utils.dateparse import parse_date
 
 
 # ==============================
 # Home / Public Views
 # ==============================
-def home(request):
-    donor_registered = 'donor_email' in request.session
-    hospital_registered = 'hospital_id' in request.session
-    urgent_requests = BloodRequest.objects.filter(status='pending', urgent=True).order_by('-created_at')
+async def arender(request, template_name, context=None):
+    """
+    render() for async views. Templates read the session (messages,
+    request.session) and that can hit the database, so rendering runs on the
+    request's sync thread; the view's own queries use the async ORM.
+    """
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@query_budget(6)
+async def home(request):
+    donor_registered = await request.session.ahas_key('donor_email')
+    hospital_registered = await request.session.ahas_key('hospital_id')
+    urgent_requests = [
+        r async for r in BloodRequest.objects.filter(status='pending', urgent=True).order_by('-created_at')
+    ]
 
     # --- New counts ---
-    total_donors = Donor.objects.count()
-    total_hospitals = Hospital.objects.count()
-    total_requests = BloodRequest.objects.count()
+    total_donors = await Donor.objects.acount()
+    total_hospitals = await Hospital.objects.acount()
+    total_requests = await BloodRequest.objects.acount()
     # -------------------
 
     # Feedback form handling
     if request.method == 'POST':
         form = FeedbackForm(request.POST)
         if form.is_valid():
-            form.save()
+            feedback_buffer.add(form.save(commit=False))
             messages.success(request, "Thank you for your feedback!")
             return redirect('home')
     else:
         form = FeedbackForm()
 
-    return render(request, 'home.html', {
+    return await arender(request, 'home.html', {
         'donor_registered': donor_registered,
         'hospital_registered': hospital_registered,
         'urgent_requests': urgent_requests,
-        'urgent_requests_count': urgent_requests.count(),
+        'urgent_requests_count': len(urgent_requests),
         'form': form,
         'total_donors': total_donors,
         'total_hospitals': total_hospitals,
@@ -59,7 +93,9 @@ def home(request):
     })
 
 
-def search_donors(request):
+@query_budget(4)
+@replica_reads
+async def search_donors(request):
     donors = None
     if any(param in request.GET for param in ["blood_group", "state", "district"]):
         blood_group = request.GET.get("blood_group", "").strip()
@@ -70,14 +106,16 @@ def search_donors(request):
             if blood_group: donors = donors.filter(blood_group__iexact=blood_group)
             if state: donors = donors.filter(state__icontains=state)
             if district: donors = donors.filter(district__icontains=district)
-            if donors.exists():
-                messages.success(request, f"✅ Found {donors.count()} donor(s).")
+            # One query; the template renders every match anyway
+            donors = [donor async for donor in donors]
+            if donors:
+                messages.success(request, f"✅ Found {len(donors)} donor(s).")
             else:
                 messages.warning(request, "⚠️ No donors available for your search.")
                 donors = None
         else:
             messages.warning(request, "⚠️ Please enter search criteria.")
-    return render(request, "search_donors.html", {"donors": donors})
+    return await arender(request, "search_donors.html", {"donors": donors})
 
 
 def hospital_public_profile(request, hospital_id):
@@ -121,7 +159,6 @@ def donor_register(request):
         district = request.POST.get('district', '')
         location = request.POST.get('location', '')
         password = request.POST['password']
-        hashed_pw = hashlib.sha256(password.encode()).hexdigest()
 
         if Donor.objects.filter(email=email).exists():
             messages.warning(request, "⚠️ Email already registered. Please log in instead.")
@@ -130,7 +167,7 @@ def donor_register(request):
         donor = Donor.objects.create(
             name=name, email=email, phone=phone, age=age, gender=gender,
             blood_group=blood_group, state=state, district=district,
-            location=location, password=hashed_pw, is_verified=True
+            location=location, password=hash_password(password), is_verified=True
         )
         request.session['donor_email'] = donor.email
         return redirect('donor_profile')
@@ -145,17 +182,13 @@ def donor_login(request):
             messages.error(request, "Please enter email and password.")
             return render(request, 'donor_login.html')
 
-        # Hash the entered password
-        hashed_pw = hashlib.sha256(password.encode()).hexdigest()
-
-        try:
-            donor = Donor.objects.get(email=email, password=hashed_pw)
-            # Successful login
+        # check_password also upgrades legacy sha256 hashes on success
+        donor = Donor.objects.filter(email=email).first()
+        if donor.check_password(password) if donor else reject_unknown_account(password):
             request.session['donor_email'] = donor.email
             messages.success(request, "Logged in successfully!")
             return redirect('donor_profile')
-        except Donor.DoesNotExist:
-            messages.error(request, "❌ Invalid email or password.")
+        messages.error(request, "❌ Invalid email or password.")
 
     return render(request, 'donor_login.html')
 
@@ -172,11 +205,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from .models import Donor, Donation, DonorRequest
 
+@query_budget(7)
 def donor_profile(request):
-    if 'donor_email' not in request.session:
+    donor = request.donor
+    if not donor:
         return redirect('donor_login')
 
-    donor = get_object_or_404(Donor, email=request.session['donor_email'])
     donation_list = Donation.objects.filter(donor=donor).order_by('-date')
     donation_count = donation_list.count()
     last_donation = donation_list.first()
@@ -220,13 +254,14 @@ def donor_profile(request):
 
 
 def edit_donor_profile(request):
-    donor_email = request.session.get('donor_email')
-    if not donor_email:
+    donor = request.donor
+    if not donor:
         return redirect('donor_login')
     
-    donor = get_object_or_404(Donor, email=donor_email)
-    
     if request.method == "POST":
+        # Edit the current row, not the cached copy, which may be stale
+        donor = get_object_or_404(Donor, pk=donor.pk)
+        old_email = donor.email
         donor.name = request.POST.get('name', donor.name)
         donor.email = request.POST.get('email', donor.email)
         donor.phone = request.POST.get('phone', donor.phone)
@@ -240,19 +275,24 @@ def edit_donor_profile(request):
         # Handle password change
         new_password = request.POST.get('password')
         if new_password:
-            donor.password = hashlib.sha256(new_password.encode()).hexdigest()
+            donor.set_password(new_password)
 
-        # Handle profile photo upload
+        # Handle profile photo upload (stored once per distinct image;
+        # thumbnails are rendered in the background after commit)
         if request.FILES.get('profile_pic'):
-            donor.profile_pic = request.FILES['profile_pic']
+            donor.profile_pic.name = store_profile_pic(request.FILES['profile_pic'])
+            schedule_variants(donor.profile_pic.name)
 
-        # Handle profile photo removal
+        # Handle profile photo removal. The file may be shared with other
+        # donors, so it is left for cleanup_profile_pics to remove.
         remove_photo = request.POST.get('remove_photo') == '1'
         if remove_photo and donor.profile_pic:
-            donor.profile_pic.delete(save=False)
             donor.profile_pic = None
         
         donor.save()
+        if donor.email != old_email:
+            forget_identity(Donor, old_email)
+            request.session['donor_email'] = donor.email
         messages.success(request, "Profile updated successfully.")
         return redirect('donor_profile')
     
@@ -282,7 +322,7 @@ def verify_donor_email(request, token):
 # ==============================
 # Blood Requests
 # ==============================
-def request_blood(request):
+async def request_blood(request):
     if request.method == "POST":
         patient_name = request.POST.get('patient_name', '').strip()
         hospital_name = request.POST.get('hospital_name', '').strip()
@@ -297,10 +337,11 @@ def request_blood(request):
 
         if not (patient_name and hospital_name and blood_group_needed and state and district and contact_number and age and gender):
             messages.warning(request, "⚠️ Please fill in all required fields.")
-            return render(request, 'request_blood.html')
+            return await arender(request, 'request_blood.html')
 
-        # Save urgent properly
-        BloodRequest.objects.create(
+        # Save urgent properly (the create, and the urgent-request emails its
+        # post_save sends, run in a worker thread)
+        await BloodRequest.objects.acreate(
             patient_name=patient_name,
             hospital_name=hospital_name,
             blood_group_needed=blood_group_needed,
@@ -315,7 +356,7 @@ def request_blood(request):
         messages.success(request, "✅ Blood request submitted successfully!")
         return redirect('request_blood')
 
-    return render(request, 'request_blood.html')
+    return await arender(request, 'request_blood.html')
 
 
 
@@ -324,7 +365,7 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import BloodRequest
 
-def blood_requests_list(request):
+def _recent_requests(request):
     # Only requests from the last 24 hours
     recent_time = timezone.now() - timedelta(hours=24)
     requests_qs = BloodRequest.objects.filter(created_at__gte=recent_time)
@@ -340,18 +381,24 @@ def blood_requests_list(request):
         requests_qs = requests_qs.filter(state__iexact=state)
     if district:
         requests_qs = requests_qs.filter(district__iexact=district)
+    return requests_qs
+
 
+@query_budget(3)
+@replica_reads
+@conditional_list('blood_requests_list.html', lambda request: (table_version(_recent_requests(request)),))
+def blood_requests_list(request):
     # Order: urgent first, then newest
-    requests_qs = requests_qs.order_by('-urgent', '-created_at')
+    requests_qs = _recent_requests(request).order_by('-urgent', '-created_at')
 
     return render(request, 'blood_requests_list.html', {'requests': requests_qs})
 
 
 
 def add_blood_request(request):
-    if 'hospital_email' not in request.session:
+    hospital = request.hospital
+    if not hospital:
         return redirect('hospital_login')
-    hospital = get_object_or_404(Hospital, email=request.session['hospital_email'])
     if request.method == "POST":
         patient_name = request.POST.get('patient_name')
         blood_group_needed = request.POST.get('blood_group_needed')
@@ -375,20 +422,23 @@ def add_blood_request(request):
 
 #blood_stock_view
 
+# Today's date is part of the version: expired stock is shown differently
+@replica_reads
+@conditional_list('live_stock.html', lambda request: (table_version(BloodStock.objects.all()), timezone.localdate()))
 def live_stock(request):
-    stocks = BloodStock.objects.all().order_by('blood_group')
+    stocks = BloodStock.objects.all().order_by('blood_type')
     return render(request, 'live_stock.html', {'stocks': stocks})
 
 #Blood stock management by hospital
 
 def manage_blood_stock(request):
-    if 'hospital_email' not in request.session:
+    hospital = request.hospital
+    if not hospital:
         return redirect('hospital_login')
 
-    hospital = Hospital.objects.get(email=request.session['hospital_email'])
     stocks = BloodStock.objects.filter(hospital=hospital)
 
-    blood_types = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']  # 👈 add this
+    blood_types = BLOOD_TYPES
 
     if request.method == 'POST':
         blood_type = request.POST.get('blood_type')
@@ -434,6 +484,7 @@ def delete_blood_stock(request, stock_id):
     return redirect('manage_blood_stock')
 
 # ---- Public view (already likely exists in your hospital_public_profile) ----
+@query_budget(3)
 def hospital_public_profile(request, hospital_id):
     hospital = get_object_or_404(Hospital, id=hospital_id)
     stocks = BloodStock.objects.filter(hospital=hospital)
@@ -444,26 +495,14 @@ def hospital_public_profile(request, hospital_id):
 # Donor Health / Eligibility
 # ==============================
 def check_eligibility(health_check):
-    if health_check.age < 18 or health_check.age > 65: return False
-    if health_check.weight < 50: return False
-    if health_check.hemoglobin_level < 12.5: return False
-    if (health_check.recent_illness or health_check.medication or health_check.alcohol_24h or
-        health_check.smoking or health_check.tattoo_6m or health_check.surgery_6m or
-        health_check.chronic_disease or health_check.pregnant or health_check.covid_recent or
-        health_check.travel_malaria):
-        return False
-    return True
+    values = {field: getattr(health_check, field) for field in NUMERIC_FIELDS + FLAG_FIELDS}
+    return not ineligibility_reasons(values)
 
 
 def detailed_health_check(request):
-    numeric_fields = ['age', 'weight', 'hemoglobin_level']
-    yesno_fields = [
-        'recent_illness', 'medication', 'alcohol_24h', 'smoking',
-        'tattoo_6m', 'surgery_6m', 'chronic_disease', 'pregnant',
-        'covid_recent', 'travel_malaria', 'high_blood_pressure', 'diabetes',
-        'heart_disease', 'iron_deficiency', 'infectious_disease',
-        'recent_dental', 'recent_vaccination', 'recent_piercing'
-    ]
+    # The questionnaire asks exactly what the eligibility rules check
+    numeric_fields = NUMERIC_FIELDS
+    yesno_fields = FLAG_FIELDS
 
     if request.method == "POST":
         form = DetailedHealthCheckForm(request.POST)
@@ -480,7 +519,10 @@ def detailed_health_check(request):
                 {"donor": getattr(health_check, "donor", None), "check": health_check},
             )
         else:
-            return render(request, "not_eligible.html", {"errors": form.errors})
+            return render(request, "not_eligible.html", {
+                "errors": form.errors,
+                "reasons": form.non_field_errors(),
+            })
     else:
         form = DetailedHealthCheckForm()
 
@@ -491,6 +533,7 @@ def detailed_health_check(request):
             "form": form,
             "numeric_fields": numeric_fields,
             "yesno_fields": yesno_fields,
+            "bounds": BOUNDS,
         },
     )
 
@@ -508,10 +551,7 @@ def hospital_register(request):
         if Hospital.objects.filter(email=email).exists():
             return render(request, 'hospital_register.html', {'hospital_names': HOSPITAL_NAMES, 'error': 'Email already registered'})
         hospital = Hospital(name=name, email=email, phone=phone, location=location)
-        if hasattr(hospital, 'set_password'):
-            hospital.set_password(password)
-        else:
-            hospital.password = password
+        hospital.set_password(password)
         hospital.save()
         return redirect('hospital_login')
     return render(request, 'hospital_register.html', {'hospital_names': HOSPITAL_NAMES})
@@ -521,15 +561,12 @@ def hospital_login(request):
     if request.method == "POST":
         email = request.POST.get('email')
         password = request.POST.get('password')
-        try:
-            hospital = Hospital.objects.get(email=email)
-            if hospital.check_password(password):
-                request.session['hospital_email'] = hospital.email
-                return redirect('hospital_profile')
-            else:
-                messages.error(request, "Invalid password")
-        except Hospital.DoesNotExist:
-            messages.error(request, "Hospital not found")
+        hospital = Hospital.objects.filter(email=email).first()
+        if hospital.check_password(password) if hospital else reject_unknown_account(password or ''):
+            request.session['hospital_email'] = hospital.email
+            return redirect('hospital_profile')
+        # Same message either way, so it doesn't reveal which emails are registered
+        messages.error(request, "Invalid email or password")
         return redirect('hospital_login')
     return render(request, 'hospital_login.html')
 
@@ -542,19 +579,42 @@ def hospital_logout(request):
 # ==============================
 # Hospital Profile & Requests
 # ==============================
+INBOX_PAGE_SIZE = 20
+DONOR_REQUEST_STATUSES = [value for value, _ in DonorRequest.status_choices]
+
+
+@query_budget(4)
 def hospital_profile(request):
-    if 'hospital_email' not in request.session:
+    hospital = request.hospital
+    if not hospital:
         return redirect('hospital_login')
-    hospital = get_object_or_404(Hospital, email=request.session['hospital_email'])
-    donor_requests = hospital.donor_requests.all().order_by('-created_at')
-    return render(request, 'hospital_profile.html', {'hospital': hospital, 'donor_requests': donor_requests})
+
+    # Paginated inbox, optionally filtered by status (served by the
+    # (hospital, status, created_at) index)
+    status = request.GET.get('status', '')
+    donor_requests = hospital.donor_requests.order_by('-created_at')
+    if status in DONOR_REQUEST_STATUSES:
+        donor_requests = donor_requests.filter(status=status)
+    else:
+        status = ''
+    page = Paginator(donor_requests, INBOX_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    return render(request, 'hospital_profile.html', {
+        'hospital': hospital,
+        'donor_requests': page.object_list,
+        'page_obj': page,
+        'status': status,
+        'statuses': DONOR_REQUEST_STATUSES,
+    })
 
 
 def edit_hospital_profile(request):
-    if 'hospital_email' not in request.session:
+    hospital = request.hospital
+    if not hospital:
         return redirect('hospital_login')
-    hospital = get_object_or_404(Hospital, email=request.session['hospital_email'])
     if request.method == "POST":
+        # Edit the current row, not the cached copy, which may be stale
+        hospital = get_object_or_404(Hospital, pk=hospital.pk)
         hospital.name = request.POST.get('name')
         hospital.phone = request.POST.get('phone')
         hospital.location = request.POST.get('location')
@@ -571,15 +631,83 @@ def hospital_dashboard(request):
     return render(request, 'hospital_dashboard.html', {'hospitals': hospitals})
 
 
-def hospital_list(request):
+DIRECTORY_PAGE_SIZE = 12
+
+
+def _stock_annotation(blood_type):
+    # 'AB+' -> 'units_ab_pos', a valid annotation name
+    return 'units_' + blood_type.lower().replace('+', '_pos').replace('-', '_neg')
+
+
+def _hospital_list_version(request):
     hospitals = Hospital.objects.all()
-    return render(request, 'hospital_list.html', {'hospitals': hospitals})
+    location = request.GET.get('location', '').strip()
+    if location:
+        hospitals = hospitals.filter(location__icontains=location)
+    return (
+        table_version(hospitals),
+        table_version(BloodStock.objects.all()),
+        table_version(DonorRequest.objects.all()),  # pending counts
+        timezone.localdate(),  # expired units drop out of the sums
+    )
+
+
+@query_budget(6)
+@replica_reads
+@conditional_list('hospital_list.html', _hospital_list_version)
+def hospital_list(request):
+    """
+    Hospital directory. Per-blood-type unexpired units and the pending donor
+    request count are computed in the same query as the page of hospitals.
+    """
+    today = timezone.localdate()
+    location = request.GET.get('location', '').strip()
+    blood_type = request.GET.get('blood_type', '')
+
+    pending_requests = (
+        DonorRequest.objects.filter(hospital=OuterRef('pk'), status='Pending')
+        .values('hospital').annotate(c=Count('pk')).values('c')
+    )
+    hospitals = Hospital.objects.only('id', 'name', 'location', 'phone').annotate(
+        **{
+            _stock_annotation(bt): Coalesce(
+                Sum('blood_stocks__units', filter=Q(blood_stocks__blood_type=bt, blood_stocks__expiry_date__gte=today)),
+                0,
+            )
+            for bt in BLOOD_TYPES
+        },
+        # A subquery rather than a second join, which would multiply the sums
+        pending_requests=Coalesce(Subquery(pending_requests, output_field=IntegerField()), 0),
+    ).order_by('name', 'id')
+
+    if location:
+        hospitals = hospitals.filter(location__icontains=location)
+    if blood_type in BLOOD_TYPES:
+        # Exists() keeps the stock join above unfiltered
+        hospitals = hospitals.filter(Exists(BloodStock.objects.filter(
+            hospital=OuterRef('pk'), blood_type=blood_type, units__gt=0, expiry_date__gte=today,
+        )))
+    else:
+        blood_type = ''
+
+    page = Paginator(hospitals, DIRECTORY_PAGE_SIZE).get_page(request.GET.get('page'))
+    for hospital in page.object_list:
+        hospital.stock_summary = [(bt, getattr(hospital, _stock_annotation(bt))) for bt in BLOOD_TYPES]
+
+    filters = {k: v for k, v in (('location', location), ('blood_type', blood_type)) if v}
+    return render(request, 'hospital_list.html', {
+        'hospitals': page.object_list,
+        'page_obj': page,
+        'blood_types': BLOOD_TYPES,
+        'location': location,
+        'blood_type': blood_type,
+        'filter_query': urlencode(filters),
+    })
 
 
 def hospital_requests_view(request):
-    hospital_email = request.session.get("hospital_email")  
-    if not hospital_email: return redirect("hospital_login")
-    hospital = get_object_or_404(Hospital, email=hospital_email)
+    hospital = request.hospital
+    if not hospital: return redirect("hospital_login")
     requests = hospital.donor_requests.all().order_by('-created_at')
     return render(request, "hospital_requests.html", {"hospital": hospital, "requests": requests})
 
@@ -589,30 +717,54 @@ def hospital_requests_view(request):
 # ==============================
 @require_POST
 def accept_request(request, req_id):
-    if 'hospital_email' not in request.session:
+    if not request.hospital:
         messages.error(request, "Please login first.")
         return redirect('hospital_login')
-    req = get_object_or_404(DonorRequest, id=req_id, hospital__email=request.session['hospital_email'])
+    req = get_object_or_404(DonorRequest, id=req_id, hospital=request.hospital)
     req.status = "Accepted"
     req.updated_at = timezone.now()
-    req.save()
+    req.save(update_fields=["status", "updated_at"])
     messages.success(request, f"Request from {req.donor_name} accepted.")
     return redirect("hospital_profile")
 
 
 @require_POST
 def reject_request(request, req_id):
-    if 'hospital_email' not in request.session:
+    if not request.hospital:
         messages.error(request, "Please login first.")
         return redirect('hospital_login')
-    req = get_object_or_404(DonorRequest, id=req_id, hospital__email=request.session['hospital_email'])
+    req = get_object_or_404(DonorRequest, id=req_id, hospital=request.hospital)
     req.status = "Rejected"
     req.updated_at = timezone.now()
-    req.save()
+    req.save(update_fields=["status", "updated_at"])
     messages.success(request, f"Request from {req.donor_name} rejected.")
     return redirect("hospital_profile")
 
 
+@require_POST
+def bulk_update_requests(request):
+    """Accepts or rejects every selected pending request with one UPDATE."""
+    if not request.hospital:
+        messages.error(request, "Please login first.")
+        return redirect('hospital_login')
+
+    new_status = {'accept': "Accepted", 'reject': "Rejected"}.get(request.POST.get('action'))
+    ids = [i for i in request.POST.getlist('ids') if i.isdigit()]
+    if not new_status or not ids:
+        messages.warning(request, "Select at least one request and an action.")
+    else:
+        # update() skips save()/auto_now, so updated_at is set explicitly
+        updated = DonorRequest.objects.filter(
+            hospital=request.hospital, id__in=ids, status="Pending",
+        ).update(status=new_status, updated_at=timezone.now())
+        messages.success(request, f"{updated} request(s) {new_status.lower()}.")
+
+    # Back to the same inbox page and filter
+    params = {k: request.POST[k] for k in ('status', 'page') if request.POST.get(k)}
+    url = reverse('hospital_profile')
+    return redirect(f"{url}?{urlencode(params)}" if params else url)
+
+
 # ==============================
 # Donor Request Form (Hospital side)
 # ==============================
@@ -635,7 +787,7 @@ def donor_request_view(request, hospital_id):
                     email=email,
                     phone=form.cleaned_data.get('donor_contact'),
                     blood_group=form.cleaned_data.get('donor_blood_group'),
-                    password=hashlib.sha256(password.encode()).hexdigest(),
+                    password=hash_password(password),
                     is_verified=True
                 )
             messages.success(request, "Request submitted successfully! You can now log in as a donor.")
@@ -649,13 +801,139 @@ def donor_request_view(request, hospital_id):
 # Feedback views
 # ==============================
 
-def feedback_view(request):
+async def feedback_view(request):
     if request.method == 'POST':
         form = FeedbackForm(request.POST)
         if form.is_valid():
-            form.save()
+            # Inserted in the background with other buffered feedback
+            feedback_buffer.add(form.save(commit=False))
             messages.success(request, 'Thank you for your feedback!')
             return redirect('feedback')
     else:
         form = FeedbackForm()
-    return render(request, 'feedback.html', {'form': form})
\ No newline at end of file
+    return await arender(request, 'feedback.html', {'form': form})
+
+
+# ==============================
+# Data exports (staff and hospitals)
+# ==============================
+def export_data(request, name):
+    """
+    Streams a whole table as CSV or JSON Lines. Query params: format=csv|jsonl,
+    gzip=1, from/to=YYYY-MM-DD. Hospitals only get their own blood stock.
+    """
+    if name not in EXPORTS:
+        raise Http404
+    staff = request.user.is_authenticated and request.user.is_staff
+    if not staff and not request.hospital:
+        return redirect('hospital_login')
+
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("format must be csv or jsonl.")
+    dates = {}
+    for param in ('from', 'to'):
+        value = request.GET.get(param)
+        dates[param] = parse_date(value) if value else None
+        if value and dates[param] is None:
+            return HttpResponseBadRequest(f"{param} must be a YYYY-MM-DD date.")
+    compress = request.GET.get('gzip') == '1'
+
+    chunks = stream_export(name, fmt, compress, dates['from'], dates['to'], hospital=None if staff else request.hospital)
+    if isinstance(request, ASGIRequest):
+        chunks = aiter_export(chunks)
+    response = StreamingHttpResponse(
+        chunks,
+        content_type='application/gzip' if compress else f"{FORMATS[fmt]}; charset=utf-8",
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(name, fmt, compress)}"'
+    return response
+
+
+# ==============================
+# Change feed for mirrors of stock and requests
+# ==============================
+@query_budget(1)
+def changes(request):
+    """
+    GET /changes?since=<cursor>[&limit=N][&model=stock|request]: the changes
+    after the cursor, oldest first, with the cursor to send next time.
+    Public, like the stock and request pages it mirrors; a deleted row
+    leaves only its delete in the feed.
+    """
+    try:
+        since = int(request.GET.get('since', 0))
+        limit = int(request.GET.get('limit', MAX_PAGE))
+    except ValueError:
+        return HttpResponseBadRequest("since and limit must be integers.")
+    model = request.GET.get('model') or None
+    if since < 0 or limit < 1 or model not in (None, *TRACKED.values()):
+        return HttpResponseBadRequest("Invalid since, limit or model.")
+
+    entries, cursor, more = changes_since(since, min(limit, MAX_PAGE), model)
+    return JsonResponse(
+        {'changes': entries, 'next': cursor, 'more': more},
+        json_dumps_params={'separators': (',', ':')},
+    )
+
+
+# ==============================
+# Analytics dashboard (staff and hospitals)
+# ==============================
+ANALYTICS_DEFAULT_DAYS = 30
+
+
+@query_budget(6)
+def analytics_dashboard(request):
+    """
+    Donation and request trends. Reads only the DailyRollup table (kept up to
+    date by `manage.py rollup_stats`), never the raw rows.
+    """
+    if not (request.user.is_authenticated and request.user.is_staff) and not request.hospital:
+        return redirect('hospital_login')
+
+    today = timezone.localdate()
+    start = parse_date(request.GET.get('from', '')) or today - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    end = parse_date(request.GET.get('to', '')) or today
+    filters = {key: request.GET.get(key, '').strip() for key in ('state', 'district', 'blood_group')}
+
+    rollups = DailyRollup.objects.filter(day__range=(start, end), **{k: v for k, v in filters.items() if v})
+    counters = {name: Sum(name) for name in ('donations', 'requests', 'urgent_requests')}
+
+    totals = rollups.aggregate(**counters)
+    return render(request, 'analytics.html', {
+        'start': start,
+        'end': end,
+        'filters': filters,
+        'totals': totals,
+        'by_day': rollups.values('day').annotate(**counters).order_by('-day'),
+        'by_district': rollups.values('state', 'district').annotate(**counters).order_by('-requests', 'district'),
+        'by_blood_group': rollups.values('blood_group').annotate(**counters).order_by('blood_group'),
+        'blood_types': BLOOD_TYPES,
+    })
+
+
+# ==============================
+# Internal metrics
+# ==============================
+@staff_member_required
+def query_metrics(request):
+    if request.method == 'POST':
+        reset_view_query_stats()
+        return redirect('query_metrics')
+    return render(request, 'query_metrics.html', {
+        'enabled': settings.QUERY_INSTRUMENTATION,
+        'views': view_query_stats(),
+    })
+
+
+def metrics(request):
+    """Prometheus scrape target, for staff or a scraper sending METRICS_TOKEN as a bearer token."""
+    if not settings.METRICS:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    sent = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    staff = request.user.is_authenticated and request.user.is_staff
+    if not staff and not (token and hmac.compare_digest(sent.encode(), token.encode())):
+        return HttpResponse("Authentication required.", status=401, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,213 @@
+# core/writebehind.py
+# Write-behind buffering for low-priority inserts (feedback so far), so they
+# don't take SQLite's write lock on the request path. add() appends the row
+# to this process's spool file and returns; a background thread inserts
+# everything pending with one bulk_create when WRITE_BEHIND_MAX_ROWS rows are
+# waiting, or WRITE_BEHIND_MAX_DELAY seconds after the last flush.
+#
+# Durability: every row is in the spool file (WRITE_BEHIND_DIR) before add()
+# returns, and the file is only deleted once its rows are committed. A normal
+# shutdown flushes at exit; spool files left by a crashed or killed process
+# are picked up by the next process to start buffering, or by
+# `manage.py flush_write_behind`. A batch whose insert fails (e.g. "database
+# is locked"), recovered or not, keeps its file and is retried before newer
+# rows on the next flush. A spool file that can't be parsed is renamed to
+# .bad for someone to look at. Delivery is at-least-once: a crash between the
+# commit and the delete inserts those rows again on recovery.
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+from .utils import pid_alive
+
+logger = logging.getLogger(__name__)
+
+BUFFERS = {}
+
+
+class WriteBehindBuffer:
+    """Buffered inserts for one model, given as 'app_label.ModelName'."""
+
+    def __init__(self, model_label):
+        self.model_label = model_label
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._reset()
+        BUFFERS[model_label] = self
+
+    def _reset(self):
+        self._pending = []
+        # (spool file, rows) taken from _pending but not inserted yet, oldest first
+        self._batches = []
+        self._spool = None
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _spool_path(self, pid, suffix='jsonl'):
+        return Path(settings.WRITE_BEHIND_DIR) / f"{self.model_label}.{pid}.{suffix}"
+
+    def add(self, obj):
+        """Queues an unsaved instance for insertion. Saves it right away with WRITE_BEHIND off."""
+        if not settings.WRITE_BEHIND:
+            obj.save()
+            return
+        row = {
+            field.attname: field.value_from_object(obj)
+            for field in obj._meta.concrete_fields if not field.primary_key
+        }
+        line = json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            # A plain write: survives the process dying, not the machine
+            self._spool.write(line)
+            self._spool.flush()
+            self._pending.append(row)
+            if len(self._pending) >= settings.WRITE_BEHIND_MAX_ROWS:
+                self._wake.set()
+
+    def _start(self):
+        Path(settings.WRITE_BEHIND_DIR).mkdir(parents=True, exist_ok=True)
+        # Files with our pid now were left by an earlier process that had it
+        # (a container restart); set aside for recover() rather than reused
+        for leftover in Path(settings.WRITE_BEHIND_DIR).glob(f"{self.model_label}.{os.getpid()}.*"):
+            if leftover.suffix in ('.jsonl', '.flushing'):
+                os.replace(leftover, self._spool_path(os.getpid(), f"{uuid.uuid4().hex}.stale"))
+        self._spool = open(self._spool_path(os.getpid()), 'a')
+        self._thread = threading.Thread(target=self._run, name=f"write-behind {self.model_label}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.recover()
+        except Exception:
+            logger.exception("Write-behind recovery for %s failed", self.model_label)
+        while not self._stopping:
+            self._wake.wait(settings.WRITE_BEHIND_MAX_DELAY)
+            self._wake.clear()
+            self.flush()
+            # This thread's connection isn't closed by any request cycle
+            connections.close_all()
+
+    def flush(self):
+        """Inserts everything pending. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                if self._pending:
+                    # New rows go to a fresh spool while these are inserted
+                    flushing = self._spool_path(os.getpid(), f"{uuid.uuid4().hex}.flushing")
+                    self._spool.close()
+                    os.replace(self._spool_path(os.getpid()), flushing)
+                    self._spool = open(self._spool_path(os.getpid()), 'a')
+                    self._batches.append((flushing, self._pending))
+                    self._pending = []
+            written = 0
+            while self._batches:
+                flushing, rows = self._batches[0]
+                try:
+                    self._insert(rows)
+                except Exception:
+                    # Stays queued (and on disk) for the next flush
+                    logger.exception("Write-behind flush of %d %s rows failed", len(rows), self.model_label)
+                    break
+                flushing.unlink()
+                self._batches.pop(0)
+                written += len(rows)
+            return written
+
+    def _insert(self, rows):
+        model = self.model
+        with transaction.atomic():
+            model.objects.bulk_create([model(**row) for row in rows], batch_size=500)
+
+    def recover(self):
+        """
+        Inserts the rows in spool files left behind by processes that are gone.
+        A file whose insert fails joins this process's queue and is retried by
+        flush(); one that can't be parsed is renamed to .bad and left alone.
+        """
+        recovered = 0
+        for path in Path(settings.WRITE_BEHIND_DIR).glob(f"{self.model_label}.*"):
+            if path.suffix == '.bad':
+                continue
+            try:
+                pid = int(path.name[len(self.model_label) + 1:].split('.')[0])
+            except ValueError:
+                continue
+            if path.suffix != '.stale' and pid_alive(pid):
+                continue
+            # Claim it first, so two recovering processes can't both insert it
+            claimed = self._spool_path(os.getpid(), f"{uuid.uuid4().hex}.flushing")
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with open(claimed) as f:
+                    rows = [json.loads(line) for line in f if line.endswith("\n")]
+            except (OSError, ValueError):
+                logger.exception("Unreadable write-behind spool %s, set aside as .bad", path.name)
+                os.replace(claimed, claimed.with_suffix('.bad'))
+                continue
+            try:
+                self._insert(rows)
+            except Exception:
+                logger.exception("Recovering %d %s rows failed; will retry", len(rows), self.model_label)
+                with self._flush_lock:
+                    self._batches.append((claimed, rows))
+                continue
+            claimed.unlink()
+            recovered += len(rows)
+        if recovered:
+            logger.info("Recovered %d buffered %s rows", recovered, self.model_label)
+        return recovered
+
+    def close(self):
+        """Stops the flusher and writes out whatever is pending (registered to run at exit)."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self.flush()
+        with self._lock:
+            self._spool.close()
+            if not self._pending:
+                self._spool_path(os.getpid()).unlink(missing_ok=True)
+        self._thread = None
+
+
+def _close_all():
+    for buffer in BUFFERS.values():
+        buffer.close()
+
+
+def _reset_after_fork():
+    # The flusher thread doesn't survive a fork, and the parent's spool file
+    # isn't ours to write
+    for buffer in BUFFERS.values():
+        buffer._lock = threading.Lock()
+        buffer._flush_lock = threading.Lock()
+        buffer._wake = threading.Event()
+        buffer._reset()
+
+
+atexit.register(_close_all)
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+feedback_buffer = WriteBehindBuffer('core.Feedback')